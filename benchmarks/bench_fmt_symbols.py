@@ -0,0 +1,68 @@
+"""
+标的代码格式化性能对比: 旧版 fmt_symbols、逐行 `.map(fmt_symbols)`、向量化 convert_symbols (字符串列及 category 列)
+
+    - 对比基准为一次性调用旧版 fmt_symbols 及逐行 map 当前 fmt_symbols (常见的 DataFrame 用法)
+    - 字符串 (object) 列的耗时主要在 factorize，高基数 (5000 个标的) 及低基数 (50 个标的) 下均只有约 5 倍加速，
+      没有达到数量级加速的目标
+    - category 列只转换类别，1000 万行时约 50 ~ 70 倍加速
+"""
+import os
+import re
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from hchyt.utils import fmt_symbols, convert_symbols
+
+
+def legacy_fmt_symbols(symbols, style=None):
+    """
+    旧版实现: 每次调用编译正则，拼接为字符串后 findall，再逐个 map
+    """
+    digit_pat = re.compile(r"\d+")
+    output_str_flag = False
+    if isinstance(symbols, str):
+        symbols = [symbols]
+        output_str_flag = True
+    symbols = ",".join(symbols)
+    digit_symbols = re.findall(digit_pat, symbols)
+    if style in ['gm', 'goldminer']:
+        symbols = list(map(lambda x: "SHSE." + x if x[0] == '6' else "SZSE."+x, digit_symbols))
+    else:
+        symbols = digit_symbols
+    if output_str_flag:
+        return symbols[0]
+    return symbols
+
+
+def gen_symbols(size: int, n_unique: int=5000, seed: int=0) -> pd.Series:
+    """
+    生成 size 行、n_unique 个不同标的的 tushare 风格标的列
+    """
+    rng = np.random.default_rng(seed)
+    universe = np.array([f"{code:06d}.{'SH' if code >= 600000 else 'SZ'}" for code in rng.choice(700000, n_unique, replace=False)], dtype=object)
+    return pd.Series(universe[rng.integers(0, n_unique, size)])
+
+
+def timeit(func, *args) -> float:
+    start = time.perf_counter()
+    func(*args)
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    for n_unique in (5000, 50):
+        print(f"{n_unique} 个不同标的:")
+        for size in (10_000, 100_000, 1_000_000, 10_000_000):
+            symbols = gen_symbols(size, n_unique)
+            legacy = timeit(legacy_fmt_symbols, symbols.tolist(), "gm")
+            per_row = timeit(lambda x: x.map(lambda symbol: fmt_symbols(symbol, "gm")), symbols)
+            vectorized = timeit(convert_symbols, symbols, "gm")
+            categorical = timeit(convert_symbols, symbols.astype("category"), "gm")
+            print(f"{size:>10d} 行: 旧版 {legacy:.4f}s, 逐行 fmt_symbols {per_row:.4f}s, "
+                  f"convert_symbols {vectorized:.4f}s (加速 {legacy / vectorized:.1f}x / {per_row / vectorized:.1f}x), "
+                  f"category 列 {categorical:.4f}s (加速 {legacy / categorical:.1f}x / {per_row / categorical:.1f}x)")
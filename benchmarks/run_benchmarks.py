@@ -0,0 +1,248 @@
+"""
+离线性能基准测试
+
+使用确定性的合成交易日历 (不访问网络)，测试热点函数在不同调用规模下的耗时，结果保存为 JSON 文件，
+便于不同版本间对比；同时在独立子进程中测试各模块的导入耗时
+
+    python benchmarks/run_benchmarks.py --output bench.json
+    python benchmarks/run_benchmarks.py --sizes 1 1000 1000000 10000000 --scalar-limit 100000
+    python benchmarks/run_benchmarks.py --output new.json --compare old.json
+
+注意: 合成交易日历写入临时目录，运行期间 HOME 指向该目录，不会读写用户主目录下的交易日历，
+运行结束后删除临时目录并恢复 HOME
+"""
+import argparse
+import datetime
+import importlib.util
+import json
+import os
+import pickle
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+DEFAULT_SIZES = [1, 1_000, 100_000, 1_000_000, 10_000_000]
+DEFAULT_SCALAR_LIMIT = 100_000
+POOL_SIZE = 100_000
+IMPORT_MODULES = ["hchyt", "hchyt.utils", "hchyt.tradecal", "hchyt.symbols", "hchyt.sessions", "pandas", "tushare"]
+
+
+def gen_synthetic_calendar(start_date: str="1990-12-19", end_date: str="2030-12-31", seed: int=0) -> list:
+    """
+    生成确定性的合成交易日历: 周一至周五，剔除元旦、劳动节 (5/1 ~ 5/3)、国庆 (10/1 ~ 10/7)，
+    以及每年 1 月下旬至 2 月中旬随机一周的"春节"
+
+    Returns:
+        list: "YYYY-mm-dd" 格式的交易日列表
+    """
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range(start_date, end_date)
+    holidays = set()
+    for year in range(dates[0].year, dates[-1].year + 1):
+        holidays.add(datetime.date(year, 1, 1))
+        holidays.update(datetime.date(year, 5, day) for day in range(1, 4))
+        holidays.update(datetime.date(year, 10, day) for day in range(1, 8))
+        spring_festival = datetime.date(year, 1, 21) + datetime.timedelta(days=int(rng.integers(0, 25)))
+        holidays.update(spring_festival + datetime.timedelta(days=day) for day in range(7))
+    return [date.strftime("%Y-%m-%d") for date in dates if date.date() not in holidays]
+
+
+def setup_fixture(trade_dates: list) -> str:
+    """
+    在临时目录下写入旧版 pickle 格式的交易日历，并将 HOME 指向该目录，首次导入时自动转换为二进制格式
+
+    Returns:
+        str: 临时目录
+    """
+    home = tempfile.mkdtemp(prefix="hchyt_bench_")
+    os.makedirs(os.path.join(home, ".config"))
+    with open(os.path.join(home, ".config", "trade_cal.pickle"), "wb") as f:
+        pickle.dump(trade_dates, f)
+    os.environ["HOME"] = home
+    return home
+
+
+def gen_inputs(trade_dates: list, seed: int=0) -> dict:
+    """
+    生成测试输入池: 随机日期、随机日内时间、随机日期区间 (不超出交易日历范围)、随机标的代码
+    """
+    rng = np.random.default_rng(seed)
+    first, last = np.datetime64(trade_dates[20], "D"), np.datetime64(trade_dates[-300], "D")
+    dates = first + rng.integers(0, (last - first).astype(np.int64), POOL_SIZE).astype("timedelta64[D]")
+    times = dates.astype("datetime64[ns]") + rng.integers(8 * 3600, 16 * 3600, POOL_SIZE).astype("timedelta64[s]")
+    window = rng.integers(1, 250, POOL_SIZE).astype("timedelta64[D]")
+    universe = np.array([f"{code:06d}.{'SH' if code >= 600000 else 'SZ'}" for code in rng.choice(700000, 5000, replace=False)], dtype=object)
+    return {
+        "dates": np.datetime_as_string(dates, unit="D").astype(object),
+        "times": np.datetime_as_string(times, unit="s").astype(object),
+        "end_dates": np.datetime_as_string(dates + window, unit="D").astype(object),
+        "symbols": universe[rng.integers(0, len(universe), POOL_SIZE)],
+    }
+
+
+def measure_imports(modules: list=IMPORT_MODULES, repeat: int=5) -> list:
+    """
+    在独立子进程中测试导入耗时 (取最小值)，并记录导入后是否加载了 pandas、tushare，跳过没有安装的模块
+    """
+    root = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+    code = (
+        "import sys, time\n"
+        "start = time.perf_counter()\n"
+        "import {module}\n"
+        "seconds = time.perf_counter() - start\n"
+        "print(seconds, 'pandas' in sys.modules, 'tushare' in sys.modules)\n"
+    )
+    results = []
+    for module in modules:
+        if importlib.util.find_spec(module.split(".")[0]) is None:
+            print(f"import {module:<20s} 没有安装，跳过")
+            continue
+        seconds = float("inf")
+        for _ in range(repeat):
+            output = subprocess.run([sys.executable, "-c", code.format(module=module)], cwd=root, check=True, capture_output=True, text=True).stdout.split()
+            seconds = min(seconds, float(output[0]))
+        results.append({"module": module, "seconds": seconds, "pandas": output[1] == "True", "tushare": output[2] == "True"})
+        print(f"import {module:<20s} {seconds:>10.4f}s  pandas={output[1]:<5s} tushare={output[2]}")
+    return results
+
+
+def take(pool: np.ndarray, size: int) -> np.ndarray:
+    """
+    从输入池中循环取 size 个元素
+    """
+    return np.resize(pool, size)
+
+
+def build_cases(utils, inputs: dict) -> list:
+    """
+    构造测试用例: (名称, 类型, 根据规模构造输入的函数, 被测函数)
+        - scalar: 逐个调用标量函数，规模为调用次数
+        - vector: 单次调用向量化函数，规模为输入长度
+    """
+    dates, times, end_dates, symbols = inputs["dates"], inputs["times"], inputs["end_dates"], inputs["symbols"]
+
+    def loop(func):
+        def run(args):
+            for arg in zip(*args):
+                func(*arg)
+        return run
+
+    return [
+        ("get_real_trade_date", "scalar", lambda size: (take(dates, size),), loop(utils.get_real_trade_date)),
+        ("get_pre_trade_date", "scalar", lambda size: (take(dates, size),), loop(utils.get_pre_trade_date)),
+        ("get_next_trade_date", "scalar", lambda size: (take(dates, size),), loop(utils.get_next_trade_date)),
+        ("to_day", "scalar", lambda size: (take(dates, size),), loop(utils.to_day)),
+        ("get_trade_dates", "scalar", lambda size: (take(dates, size), take(end_dates, size)), loop(utils.get_trade_dates)),
+        ("fmt_symbols", "scalar", lambda size: (take(symbols, size), ["gm"] * size), loop(utils.fmt_symbols)),
+        ("get_trade_time_type", "scalar", lambda size: (take(times, size),), loop(utils.get_trade_time_type)),
+        ("get_real_trade_dates", "vector", lambda size: take(dates, size).astype("datetime64[D]"), utils.get_real_trade_dates),
+        ("get_pre_trade_dates", "vector", lambda size: take(dates, size).astype("datetime64[D]"), utils.get_pre_trade_dates),
+        ("get_next_trade_dates", "vector", lambda size: take(dates, size).astype("datetime64[D]"), utils.get_next_trade_dates),
+        ("convert_symbols", "vector", lambda size: pd.Series(take(symbols, size)), lambda values: utils.convert_symbols(values, "gm")),
+        ("get_trade_time_types", "vector", lambda size: take(times, size).astype("datetime64[ns]"), utils.get_trade_time_types),
+    ]
+
+
+def run(sizes: list, scalar_limit: int, repeat: int) -> dict:
+    """
+    运行所有测试用例，返回可序列化为 JSON 的结果
+    """
+    imports = measure_imports()
+    trade_dates = gen_synthetic_calendar()
+    original_home = os.environ.get("HOME")
+    home = setup_fixture(trade_dates)
+    try:
+        return _run_cases(trade_dates, home, imports, sizes, scalar_limit, repeat)
+    finally:
+        if original_home is None:
+            os.environ.pop("HOME", None)
+        else:
+            os.environ["HOME"] = original_home
+        shutil.rmtree(home, ignore_errors=True)
+
+
+def _run_cases(trade_dates: list, home: str, imports: list, sizes: list, scalar_limit: int, repeat: int) -> dict:
+    """
+    在合成交易日历上运行所有测试用例
+    """
+    # 导入放在 HOME 重定向之后，保证使用合成交易日历
+    from hchyt import utils
+
+    start = time.perf_counter()
+    trade_cal = utils.load_calendar()
+    load_seconds = time.perf_counter() - start
+
+    inputs = gen_inputs(trade_dates)
+    results = [{"name": "load_calendar", "kind": "scalar", "size": 1, "seconds": load_seconds, "ns_per_call": load_seconds * 1e9}]
+    for name, kind, make_args, func in build_cases(utils, inputs):
+        for size in sizes:
+            if kind == "scalar" and size > scalar_limit:
+                continue
+            args = make_args(size)
+            seconds = float("inf")
+            for _ in range(repeat):
+                start = time.perf_counter()
+                func(args)
+                seconds = min(seconds, time.perf_counter() - start)
+            results.append({"name": name, "kind": kind, "size": size, "seconds": seconds, "ns_per_call": seconds / size * 1e9})
+            print(f"{name:<24s} {kind:<6s} {size:>10d}  {seconds:>10.4f}s  {seconds / size * 1e9:>12.1f} ns/call")
+
+    return {
+        "created_at": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "calendar": {"first": trade_cal.first, "last": trade_cal.last, "size": len(trade_cal), "home": home},
+        "imports": imports,
+        "results": results,
+    }
+
+
+def compare(report: dict, baseline: dict) -> None:
+    """
+    与基准结果对比，输出每个用例的耗时比值 (>1 表示变慢)
+    """
+    baseline_results = {(item["name"], item["size"]): item for item in baseline["results"]}
+    print(f"\n{'name':<24s} {'size':>10s}  {'baseline':>10s}  {'current':>10s}  {'ratio':>7s}")
+    for item in report["results"]:
+        base = baseline_results.get((item["name"], item["size"]))
+        if base is None or base["seconds"] == 0:
+            continue
+        ratio = item["seconds"] / base["seconds"]
+        print(f"{item['name']:<24s} {item['size']:>10d}  {base['seconds']:>10.4f}  {item['seconds']:>10.4f}  {ratio:>6.2f}x")
+
+    baseline_imports = {item["module"]: item for item in baseline.get("imports", [])}
+    for item in report.get("imports", []):
+        base = baseline_imports.get(item["module"])
+        if base is None or base["seconds"] == 0:
+            continue
+        ratio = item["seconds"] / base["seconds"]
+        print(f"{'import ' + item['module']:<24s} {'':>10s}  {base['seconds']:>10.4f}  {item['seconds']:>10.4f}  {ratio:>6.2f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="hchyt 离线性能基准测试")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="调用规模")
+    parser.add_argument("--scalar-limit", type=int, default=DEFAULT_SCALAR_LIMIT, help="标量函数逐个调用的最大规模")
+    parser.add_argument("--repeat", type=int, default=3, help="每个用例重复次数，取最小耗时")
+    parser.add_argument("--output", default="bench_results.json", help="结果保存地址")
+    parser.add_argument("--compare", default=None, help="用于对比的历史结果")
+    args = parser.parse_args()
+
+    report = run(args.sizes, args.scalar_limit, args.repeat)
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(f"\n结果已保存至 {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(report, json.load(f))
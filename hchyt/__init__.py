@@ -1,4 +1,24 @@
 """
 This is my quant toolbox.
 """
-print("Welcome to hchyt quant box!")
\ No newline at end of file
+import logging
+import os
+
+
+def _log_prefetch_error(exchange: str):
+    """
+    后台预先导入失败时记录日志，否则异常只保存在 Future 中，不会被发现
+    """
+    def callback(future):
+        if not future.cancelled() and future.exception() is not None:
+            logging.getLogger(__name__).warning(f"[WARNING]\t后台预先导入 {exchange} 交易日历失败", exc_info=future.exception())
+    return callback
+
+
+# 进程启动时在后台预先导入交易日历，HCHYT_PREFETCH 为逗号分隔的交易所代码，如 "SSE,SZSE"
+if os.environ.get("HCHYT_PREFETCH"):
+    from .tradecal import prefetch
+
+    for _exchange in os.environ["HCHYT_PREFETCH"].split(","):
+        if _exchange.strip():
+            prefetch(exchange=_exchange.strip()).add_done_callback(_log_prefetch_error(_exchange.strip()))
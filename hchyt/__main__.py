@@ -0,0 +1,6 @@
+"""
+python -m hchyt 等同于命令行工具 hchyt
+"""
+from .cli import main
+
+raise SystemExit(main())
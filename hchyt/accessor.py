@@ -0,0 +1,204 @@
+"""
+pandas 扩展: 按交易日历偏移、吸附日期，以及将数据对齐到交易日
+
+导入本模块后，Series 及 DataFrame 上注册 `hchyt` 访问器:
+
+    import hchyt.accessor
+    df.hchyt.shift_trading(1)
+    events.hchyt.snap(direction=-1)
+    df.hchyt.reindex_trading("2023-01-01", "2023-12-31", fill="ffill")
+
+    - 日期类型 (datetime64) 的 Series 对取值进行偏移、吸附，其他情况对索引中的日期进行偏移、吸附
+    - MultiIndex (如 (date, symbol) 面板数据) 默认使用第一个日期类型的层级，偏移、吸附只转换该层级的唯一值，不需要 unstack
+    - 结果中的日期均为不带时区的 datetime64[ns] (时区日期按当地日期处理)
+"""
+from typing import Union
+
+import numpy as np
+import pandas as pd
+
+from .dates import to_day, _to_days_array
+from .tradecal import load_calendar
+
+
+def _days_to_index(days: np.ndarray, mask: np.ndarray, name=None) -> pd.DatetimeIndex:
+    """
+    将天数序号数组转换为 DatetimeIndex，mask 对应位置为 NaT
+    """
+    values = days.astype("datetime64[D]").astype("datetime64[ns]")
+    values[mask] = np.datetime64("NaT")
+    return pd.DatetimeIndex(values, name=name)
+
+
+@pd.api.extensions.register_series_accessor("hchyt")
+@pd.api.extensions.register_dataframe_accessor("hchyt")
+class HchytAccessor:
+    """
+    按交易日历处理 Series/DataFrame 中的日期
+
+    Args:
+        obj: pandas Series 或 DataFrame
+    """
+
+    def __init__(self, obj: Union[pd.Series, pd.DataFrame]):
+        self._obj = obj
+
+    def _on_values(self) -> bool:
+        return isinstance(self._obj, pd.Series) and pd.api.types.is_datetime64_any_dtype(self._obj.dtype)
+
+    def _date_level(self, level: Union[int, str]=None) -> Union[int, None]:
+        """
+        日期所在的索引层级，索引不是 MultiIndex 时返回 None
+        """
+        index = self._obj.index
+        if not isinstance(index, pd.MultiIndex):
+            if level not in (None, 0, index.name):
+                raise ValueError(f"[ERROR]\t索引没有层级 {level}")
+            return None
+        if level is None:
+            for i, values in enumerate(index.levels):
+                if pd.api.types.is_datetime64_any_dtype(values.dtype):
+                    return i
+            return 0
+        if isinstance(level, int):
+            return level
+        if level not in index.names:
+            raise ValueError(f"[ERROR]\t索引没有层级 {level}")
+        return index.names.index(level)
+
+    def _map_dates(self, func, level: Union[int, str]=None) -> pd.Index:
+        """
+        对索引中的日期做向量化转换，func 输入输出均为天数序号数组，MultiIndex 只转换日期层级的唯一值
+        """
+        index = self._obj.index
+        i = self._date_level(level)
+        if i is None:
+            days, mask = _to_days_array(index)
+            return _days_to_index(func(days, mask), mask, index.name)
+
+        days, mask = _to_days_array(index.levels[i])
+        dates = _days_to_index(func(days, mask), mask, index.names[i])
+        if dates.is_unique and not mask.any():
+            return index.set_levels(dates, level=i, verify_integrity=False)
+        # 多个日期转换为同一日期 (如周末吸附到同一交易日) 时重新构造层级
+        arrays = [index.get_level_values(j) for j in range(index.nlevels)]
+        arrays[i] = dates.take(index.codes[i], allow_fill=True, fill_value=pd.NaT)
+        return pd.MultiIndex.from_arrays(arrays, names=index.names)
+
+    def _apply(self, func, level: Union[int, str]=None) -> Union[pd.Series, pd.DataFrame]:
+        if self._on_values():
+            days, mask = _to_days_array(self._obj)
+            return pd.Series(_days_to_index(func(days, mask), mask).values, index=self._obj.index, name=self._obj.name)
+        return self._obj.set_axis(self._map_dates(func, level))
+
+    def snap(self, direction: int=-1, level: Union[int, str]=None, exchange: str=None) -> Union[pd.Series, pd.DataFrame]:
+        """
+        将日期吸附到交易日，日期为交易日时不变，否则按指定方向取最近的交易日，见 `TradingCalendar.snap_days`
+
+        Args:
+            direction: 查询方向，-1 往历史回溯，1 往未来推演
+            level: 日期所在的索引层级，默认为第一个日期类型的层级
+            exchange: 交易所代码，默认为 "SSE"
+
+        Returns:
+            日期吸附后的 Series/DataFrame
+        """
+        trade_cal = load_calendar(exchange=exchange)
+        return self._apply(lambda days, mask: trade_cal.snap_days(days, direction, mask), level)
+
+    def shift_trading(
+        self,
+        n: int=1,
+        inclusive: bool=False,
+        align: bool=False,
+        level: Union[int, str]=None,
+        exchange: str=None) -> Union[pd.Series, pd.DataFrame]:
+        """
+        将日期偏移 n 个交易日，语义与 `get_next_trade_dates` (n 为正)/`get_pre_trade_dates` (n 为负) 一致
+            - 与 pandas 的 `shift(n, freq=...)` 一致，偏移的是日期而不是数据，t 日的数据偏移后位于 t + n 个交易日
+            - align 为 True 时将偏移结果重新对齐到原索引，即 t 日取 t - n 个交易日的数据 (面板数据按标的分别对齐)，
+              用于因子滞后，要求偏移后的索引没有重复
+
+        Args:
+            n: 偏移的交易日数目，正数往未来推演，负数往历史回溯，不能为 0
+            inclusive: 当日期为交易日的时候，是否包含该日期
+            align: 是否对齐到原索引
+            level: 日期所在的索引层级，默认为第一个日期类型的层级
+            exchange: 交易所代码，默认为 "SSE"
+
+        Returns:
+            日期偏移后的 Series/DataFrame
+        """
+        trade_cal = load_calendar(exchange=exchange)
+        shifted = self._apply(lambda days, mask: trade_cal.shift_days(days, n, inclusive, mask), level)
+        if align and not self._on_values():
+            return shifted.reindex(self._obj.index)
+        return shifted
+
+    def reindex_trading(
+        self,
+        start_date=None,
+        end_date=None,
+        fill: str=None,
+        level: Union[int, str]=None,
+        exchange: str=None) -> Union[pd.Series, pd.DataFrame]:
+        """
+        将数据对齐到 [start_date, end_date] 内的所有交易日
+            - 面板数据对齐到 交易日 x 其他层级取值 (如所有标的)，不需要 unstack，结果保持原数据的层级顺序，
+              原数据已排序时结果同样排序
+            - fill 为 "ffill" 时，非交易日 (如节假日) 及开始日期之前的数据会向后填充到之后的交易日，
+              面板数据按标的分别填充，与 `reindex(method="ffill")` 一致，只填充对齐产生的缺失，原数据中的缺失值不填充
+
+        Args:
+            start_date: 开始日期，默认为数据中最早的日期
+            end_date: 结束日期，默认为数据中最晚的日期
+            fill: 缺失值填充方式，None 不填充，"ffill" 向后填充，"bfill" 向前填充
+            level: 日期所在的索引层级，默认为第一个日期类型的层级
+            exchange: 交易所代码，默认为 "SSE"
+
+        Returns:
+            对齐后的 Series/DataFrame
+        """
+        if fill not in (None, "ffill", "bfill"):
+            raise ValueError(f"[ERROR]\t不支持的填充方式 {fill}，只支持 None、'ffill'、'bfill'")
+        trade_cal = load_calendar(exchange=exchange)
+        index = self._obj.index
+        i = self._date_level(level)
+
+        # 1. 目标交易日
+        days, mask = _to_days_array(index if i is None else index.levels[i])
+        if mask.all():
+            raise ValueError("[ERROR]\t索引中没有日期")
+        start_day = to_day(start_date) if start_date is not None else int(days[~mask].min())
+        end_day = to_day(end_date) if end_date is not None else int(days[~mask].max())
+        trade_days = trade_cal.view(start_day, end_day, output="day").days
+        dates = _days_to_index(trade_days, np.zeros(trade_days.shape, dtype=bool), index.name if i is None else index.names[i])
+
+        # 2. 目标索引，面板数据为 交易日 x 其他层级取值，日期为第一层时按日期排列，否则按其他层级排列
+        source = self._obj.set_axis(self._map_dates(lambda days, mask: days, level))
+        if i is None:
+            target = dates
+        else:
+            others = index.droplevel(i).unique().to_frame(index=False)
+            if i == 0:
+                positions, date_positions = np.tile(np.arange(len(others)), len(dates)), np.repeat(np.arange(len(dates)), len(others))
+            else:
+                positions, date_positions = np.repeat(np.arange(len(others)), len(dates)), np.tile(np.arange(len(dates)), len(others))
+            arrays = [others.iloc[:, k].values.take(positions) for k in range(others.shape[1])]
+            arrays.insert(i, dates.take(date_positions))
+            target = pd.MultiIndex.from_arrays(arrays, names=index.names)
+            if index.is_monotonic_increasing:
+                target = target.sort_values()
+        if fill is None:
+            return source.reindex(target)
+
+        # 3. 合并原数据及目标索引，按日期顺序 (面板数据按其他层级分组) 填充原数据的行号，再按行号取数据
+        dated = source.index.notna() if i is None else source.index.get_level_values(i).notna()
+        source = source[dated]
+        rows = pd.Series(np.arange(len(source), dtype=np.float64), index=source.index)
+        combined = rows.reindex(source.index.union(target).sort_values())
+        if i is not None:
+            combined = combined.groupby(level=[j for j in range(index.nlevels) if j != i], sort=False)
+        rows = (combined.ffill() if fill == "ffill" else combined.bfill()).reindex(target).to_numpy()
+        rows = np.where(np.isnan(rows), -1, rows).astype(np.int64)
+        return source.set_axis(pd.RangeIndex(len(source))).reindex(rows).set_axis(target)
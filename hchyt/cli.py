@@ -0,0 +1,343 @@
+"""
+命令行工具 hchyt
+
+    hchyt gen [--exchange SSE] [--incremental]        生成或增量更新交易日历
+    hchyt status [--json]                             查看本地交易日历状态
+    hchyt shift N / snap / session / symbols          批量转换日期、交易时间段及标的代码
+
+批量转换从标准输入或文件按块 (默认 100 万行) 读取，每块向量化转换后写入标准输出或文件，内存占用与输入大小无关
+    - 输入输出格式: 纯文本 (每行一个值)、CSV、Parquet (需要 pyarrow)，默认按文件扩展名判断，标准输入输出为纯文本
+    - CSV/Parquet 转换 --column 指定的列 (默认为第一列)，结果写入 --output-column (默认覆盖原列)，其他列原样输出
+    - 日期输出为 "YYYY-mm-dd" 格式，缺失值输出为空
+"""
+from __future__ import annotations
+
+import argparse
+import datetime
+import json
+import os
+import sys
+from typing import TYPE_CHECKING, Callable, Iterator, List
+
+import numpy as np
+
+from .dates import to_day, _to_str, _to_days_array
+from .providers import FileProvider
+from .tradecal import gen_trade_calendar, load_calendar, _config_path, _map_cal_section, _read_cal_index
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# 批量转换每块的行数
+_CHUNKSIZE = 1_000_000
+_FORMATS = ("text", "csv", "parquet")
+_EXTENSIONS = {".csv": "csv", ".parquet": "parquet", ".pq": "parquet"}
+
+
+def _detect_format(path: str, fmt: str=None) -> str:
+    """
+    输入输出格式，没有指定时按文件扩展名判断，标准输入输出为纯文本
+    """
+    if fmt:
+        return fmt
+    if path in (None, "-"):
+        return "text"
+    return _EXTENSIONS.get(os.path.splitext(path)[1].lower(), "text")
+
+
+def _parquet():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        raise ValueError("[ERROR]\t读写 Parquet 文件需要安装 pyarrow")
+    return pyarrow, pyarrow.parquet
+
+
+def _read_chunks(path: str, fmt: str, column: str, chunksize: int) -> Iterator[pd.DataFrame]:
+    """
+    按块读取输入，每块为一个 DataFrame，纯文本输入的列名为 column (默认为 "value")
+    """
+    import pandas as pd
+
+    stdin = path in (None, "-")
+    if fmt == "parquet":
+        if stdin:
+            raise ValueError("[ERROR]\tParquet 格式不支持从标准输入读取")
+        _, parquet = _parquet()
+        for batch in parquet.ParquetFile(path).iter_batches(batch_size=chunksize):
+            yield batch.to_pandas()
+        return
+
+    # 所有列均按字符串读取，不做缺失值识别，其他列原样输出，空字符串在转换时视为缺失值
+    options = dict(chunksize=chunksize, dtype=object, na_filter=False)
+    if fmt == "text":
+        # 每行为一个值，使用不会出现的分隔符并关闭引号解析
+        options.update(sep="\x1f", header=None, names=[column or "value"], quoting=3, skip_blank_lines=False)
+    with pd.read_csv(sys.stdin.buffer if stdin else path, **options) as reader:
+        yield from reader
+
+
+class _ChunkWriter:
+    """
+    按块写出结果，纯文本只写出结果列，CSV/Parquet 写出所有列
+    """
+
+    def __init__(self, path: str, fmt: str):
+        self.fmt = fmt
+        self._stdout = path in (None, "-")
+        if fmt == "parquet" and self._stdout:
+            raise ValueError("[ERROR]\tParquet 格式不支持写入标准输出")
+        self._path = path
+        self._out = sys.stdout if self._stdout else (None if fmt == "parquet" else open(path, "w", newline=""))
+        self._writer = None
+        self._header = True
+
+    def write(self, frame: pd.DataFrame, column: str) -> None:
+        if self.fmt == "text":
+            if len(frame):
+                values = frame[column].to_numpy(dtype=object)
+                # 转换结果中的缺失值均为 None
+                missing = np.equal(values, None)
+                if missing.any():
+                    values = values.copy()
+                    values[missing] = ""
+                self._out.write("\n".join(map(str, values.tolist())) + "\n")
+        elif self.fmt == "csv":
+            frame.to_csv(self._out, header=self._header, index=False, lineterminator="\n")
+        else:
+            pyarrow, parquet = _parquet()
+            table = pyarrow.Table.from_pandas(frame, preserve_index=False)
+            if self._writer is None:
+                self._writer = parquet.ParquetWriter(self._path, table.schema)
+            self._writer.write_table(table.cast(self._writer.schema))
+        self._header = False
+
+    def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+        if self._stdout:
+            self._out.flush()
+        elif self._out is not None:
+            self._out.close()
+
+
+def _map_unique(values: pd.Series, func: Callable) -> np.ndarray:
+    """
+    对每个不同取值只转换一次再按位置还原，日期、时间等重复度高的列转换量远小于行数，
+    缺失值及空字符串转换为 None
+    """
+    import pandas as pd
+
+    codes, uniques = pd.factorize(values.to_numpy())
+    uniques = np.asarray(uniques)
+    valid = uniques != "" if uniques.dtype == object else np.ones(len(uniques), dtype=bool)
+    converted = np.empty(len(uniques) + 1, dtype=object)
+    converted[:-1][valid] = func(uniques[valid])
+    return converted[codes]
+
+
+def _format_days(days: np.ndarray, mask: np.ndarray) -> np.ndarray:
+    """
+    天数序号数组转换为 "YYYY-mm-dd" 格式字符串，缺失值为 None
+    """
+    values = np.datetime_as_string(days.astype("datetime64[D]"), unit="D").astype(object)
+    values[mask] = None
+    return values
+
+
+def _convert(args: argparse.Namespace, func: Callable) -> int:
+    """
+    按块读取输入、转换指定列并写出
+    """
+    import pandas as pd
+
+    writer = _ChunkWriter(args.output, _detect_format(args.output, args.output_format))
+    try:
+        for frame in _read_chunks(args.input, _detect_format(args.input, args.input_format), args.column, args.chunksize):
+            column = args.column or frame.columns[0]
+            if column not in frame.columns:
+                raise ValueError(f"[ERROR]\t输入中没有 {column} 列，输入的列为 {list(frame.columns)}")
+            output_column = args.output_column or column
+            # 保持 object 类型，避免缺失值 None 被转换为 NaN
+            frame[output_column] = pd.Series(func(frame[column]), index=frame.index, dtype=object)
+            writer.write(frame, output_column)
+    finally:
+        writer.close()
+    return 0
+
+
+def _cmd_shift(args: argparse.Namespace) -> int:
+    trade_cal = load_calendar(args.calendar, args.exchange)
+
+    def shift(values: np.ndarray) -> np.ndarray:
+        days, mask = _to_days_array(values)
+        return _format_days(trade_cal.shift_days(days, args.n, args.inclusive, mask), mask)
+
+    return _convert(args, lambda values: _map_unique(values, shift))
+
+
+def _cmd_snap(args: argparse.Namespace) -> int:
+    trade_cal = load_calendar(args.calendar, args.exchange)
+
+    def snap(values: np.ndarray) -> np.ndarray:
+        days, mask = _to_days_array(values)
+        return _format_days(trade_cal.snap_days(days, args.direction, mask), mask)
+
+    return _convert(args, lambda values: _map_unique(values, snap))
+
+
+def _cmd_session(args: argparse.Namespace) -> int:
+    from .sessions import get_trade_time_types
+
+    return _convert(args, lambda values: _map_unique(values, lambda times: np.asarray(get_trade_time_types(times, args.exchange, args.calendar), dtype=object)))
+
+
+def _cmd_symbols(args: argparse.Namespace) -> int:
+    from .symbols import convert_symbols
+
+    if args.securities:
+        from .securities import load_securities
+
+        load_securities(args.securities, register=True)
+    return _convert(args, lambda values: _map_unique(values, lambda symbols: convert_symbols(symbols, args.style)))
+
+
+def _cmd_gen(args: argparse.Namespace) -> int:
+    provider = FileProvider(args.source) if args.source else None
+    securities = args.securities_source or args.securities
+    exchanges = args.exchange or [None]
+    for i, exchange in enumerate(exchanges):
+        gen_trade_calendar(
+            start_date=args.start,
+            end_date=args.end,
+            output=args.output,
+            local_config=args.config,
+            incremental=args.incremental,
+            retries=args.retries,
+            exchange=exchange,
+            provider=provider,
+            securities=securities if i == 0 else False,
+        )
+    return 0
+
+
+def _calendar_status(local_cal: str) -> dict:
+    """
+    本地交易日历文件状态，只读取文件头及目录，不访问网络
+    """
+    local_cal = os.path.abspath(local_cal or _config_path("trade_cal.bin"))
+    if not os.path.exists(local_cal):
+        raise ValueError(f"[ERROR]\t交易日历文件 {local_cal} 不存在，请先运行 hchyt gen")
+    stat = os.stat(local_cal)
+    today = to_day(datetime.date.today())
+    calendars = []
+    for name, section in _read_cal_index(local_cal).items():
+        trade_cal = _map_cal_section(local_cal, section)
+        calendars.append({
+            "exchange": name,
+            "trade_days": len(trade_cal),
+            "valid_from": _to_str(trade_cal.valid_from),
+            "valid_through": _to_str(trade_cal.valid_through),
+            "first": trade_cal.first,
+            "last": trade_cal.last,
+            "stale": trade_cal.valid_through < today,
+        })
+    return {
+        "path": local_cal,
+        "size": stat.st_size,
+        "modified": datetime.datetime.fromtimestamp(stat.st_mtime).isoformat(timespec="seconds"),
+        "calendars": calendars,
+    }
+
+
+def _cmd_status(args: argparse.Namespace) -> int:
+    status = _calendar_status(args.calendar)
+    if args.json:
+        print(json.dumps(status, ensure_ascii=False))
+        return 0
+    print(f"文件: {status['path']} ({status['size']} 字节，更新于 {status['modified']})")
+    for calendar in status["calendars"]:
+        stale = "，已过期" if calendar["stale"] else ""
+        print(f"{calendar['exchange']:<14}{calendar['trade_days']:>7} 个交易日  覆盖 [{calendar['valid_from']}, {calendar['valid_through']}]  交易日 [{calendar['first']}, {calendar['last']}]{stale}")
+    return 0
+
+
+def _add_io_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("-i", "--input", default="-", help="输入文件，默认为标准输入")
+    parser.add_argument("-o", "--output", default="-", help="输出文件，默认为标准输出")
+    parser.add_argument("--input-format", choices=_FORMATS, help="输入格式，默认按扩展名判断")
+    parser.add_argument("--output-format", choices=_FORMATS, help="输出格式，默认按扩展名判断")
+    parser.add_argument("-c", "--column", help="CSV/Parquet 中需要转换的列，默认为第一列")
+    parser.add_argument("--output-column", help="结果列，默认覆盖转换的列")
+    parser.add_argument("--chunksize", type=int, default=_CHUNKSIZE, help=f"每块的行数，默认为 {_CHUNKSIZE}")
+
+
+def _add_calendar_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--exchange", help="交易所代码，默认为 SSE")
+    parser.add_argument("--calendar", help="本地交易日历文件，默认为 ~/.config/trade_cal.bin")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="hchyt", description="交易日历、交易时间段及标的代码工具")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    gen = subparsers.add_parser("gen", help="生成或增量更新交易日历")
+    gen.add_argument("--start", help="起始日期，默认为 1990-01-01")
+    gen.add_argument("--end", help="结束日期，默认为当年 12-31")
+    gen.add_argument("--output", help="交易日历文件，默认为 ~/.config/trade_cal.bin")
+    gen.add_argument("--config", help="tushare 配置文件，默认为 ~/.config/user_info.toml")
+    gen.add_argument("--exchange", action="append", help="交易所代码，可重复指定，默认为 SSE")
+    gen.add_argument("--incremental", action="store_true", help="只查询本地未覆盖的区间")
+    gen.add_argument("--source", help="从本地 CSV/文本文件读取交易日历，不访问网络")
+    gen.add_argument("--securities", action="store_true", help="同时从交易日历数据源生成证券主表，保存在交易日历文件所在目录")
+    gen.add_argument("--securities-source", help="同时从本地证券列表 CSV 文件生成证券主表，不访问网络")
+    gen.add_argument("--retries", type=int, default=3, help="查询失败时的重试次数")
+    gen.set_defaults(func=_cmd_gen)
+
+    status = subparsers.add_parser("status", help="查看本地交易日历状态")
+    status.add_argument("--calendar", help="本地交易日历文件，默认为 ~/.config/trade_cal.bin")
+    status.add_argument("--json", action="store_true", help="以 JSON 格式输出")
+    status.set_defaults(func=_cmd_status)
+
+    shift = subparsers.add_parser("shift", help="将日期偏移 N 个交易日")
+    shift.add_argument("n", type=int, help="偏移的交易日数目，正数往未来推演，负数往历史回溯")
+    shift.add_argument("--inclusive", action="store_true", help="日期为交易日时包含该日期")
+    _add_calendar_arguments(shift)
+    _add_io_arguments(shift)
+    shift.set_defaults(func=_cmd_shift)
+
+    snap = subparsers.add_parser("snap", help="将日期吸附到交易日")
+    snap.add_argument("--direction", type=int, choices=(-1, 1), default=-1, help="-1 往历史回溯 (默认)，1 往未来推演")
+    _add_calendar_arguments(snap)
+    _add_io_arguments(snap)
+    snap.set_defaults(func=_cmd_snap)
+
+    session = subparsers.add_parser("session", help="查询时间所处的交易时间段")
+    _add_calendar_arguments(session)
+    _add_io_arguments(session)
+    session.set_defaults(func=_cmd_session)
+
+    symbols = subparsers.add_parser("symbols", help="格式化标的代码")
+    symbols.add_argument("--style", help="标的编码风格: gm/ts/jq/wd，默认只输出数字编码")
+    symbols.add_argument("--securities", help="使用证券主表文件中的准确交易所")
+    _add_io_arguments(symbols)
+    symbols.set_defaults(func=_cmd_symbols)
+    return parser
+
+
+def main(argv: List[str]=None) -> int:
+    """
+    命令行入口
+    """
+    args = build_parser().parse_args(argv)
+    try:
+        return args.func(args)
+    except BrokenPipeError:
+        # 下游提前关闭管道 (如 head)，不再输出
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return 0
+    except (ValueError, OSError) as e:
+        print(str(e), file=sys.stderr)
+        return 1
+
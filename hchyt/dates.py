@@ -0,0 +1,250 @@
+"""
+日期转换工具，交易日统一以自 1970-01-01 起的天数序号 (与 numpy datetime64[D] 一致) 表示
+"""
+from __future__ import annotations
+
+import datetime
+from functools import lru_cache
+from typing import TYPE_CHECKING, Union, List, Tuple
+
+import numpy as np
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+_EPOCH_ORDINAL = datetime.date(1970, 1, 1).toordinal()
+
+
+# 天数序号的输出类型: 天数序号、datetime.date、"YYYY-mm-dd" 字符串
+DAY_OUTPUTS = ("day", "date", "str")
+
+# 8 位整数视为 YYYYmmdd 格式的日期，其余整数视为天数序号
+_YYYYMMDD_MIN, _YYYYMMDD_MAX = 10000101, 99991231
+
+
+@lru_cache(maxsize=8192)
+def _parse_day(cursor_date: str) -> int:
+    """
+    解析字符串日期，结果有缓存
+        - "YYYY-mm-dd"、"YYYY/mm/dd"、"YYYY.mm.dd"，以及以此开头、以空格或 "T" 分隔的时间字符串
+        - "YYYYmmdd"
+        - 其他格式交由 pandas 解析
+    """
+    text = cursor_date.strip()
+    if len(text) >= 10 and text[4] == text[7] and text[4] in "-/." and (len(text) == 10 or text[10] in " T"):
+        return datetime.date(int(text[:4]), int(text[5:7]), int(text[8:10])).toordinal() - _EPOCH_ORDINAL
+    if len(text) == 8 and text.isdigit():
+        return datetime.date(int(text[:4]), int(text[4:6]), int(text[6:])).toordinal() - _EPOCH_ORDINAL
+    import pandas as pd
+    return pd.Timestamp(text).toordinal() - _EPOCH_ORDINAL
+
+
+def to_day(cursor_date: Union[str, int, datetime.date, pd.Timestamp, np.datetime64]) -> int:
+    """
+    将日期转换为自 1970-01-01 起的天数序号，常见输入不依赖 pandas
+        - 字符串: "YYYY-mm-dd"、"YYYY/mm/dd"、"YYYYmmdd" 及以日期开头的时间字符串，解析结果有缓存
+        - 整数: 8 位整数为 YYYYmmdd (如 20230113)，其余整数视为天数序号
+        - datetime.date、datetime.datetime、pd.Timestamp (datetime.datetime 的子类)
+        - numpy datetime64
+
+    Args:
+        cursor_date: 指定日期
+
+    Returns:
+        int: 天数序号
+    """
+    if isinstance(cursor_date, str):
+        return _parse_day(cursor_date)
+    if isinstance(cursor_date, (int, np.integer)) and not isinstance(cursor_date, bool):
+        value = int(cursor_date)
+        if _YYYYMMDD_MIN <= value <= _YYYYMMDD_MAX:
+            return datetime.date(value // 10000, value // 100 % 100, value % 100).toordinal() - _EPOCH_ORDINAL
+        return value
+    if isinstance(cursor_date, datetime.date):
+        return cursor_date.toordinal() - _EPOCH_ORDINAL
+    if isinstance(cursor_date, np.datetime64):
+        if np.isnat(cursor_date):
+            raise ValueError("[ERROR]\t日期不能为 NaT")
+        return int(cursor_date.astype("datetime64[D]").astype(np.int64))
+    import pandas as pd
+    return pd.Timestamp(cursor_date).toordinal() - _EPOCH_ORDINAL
+
+
+def from_day(day: int, output: str="str") -> Union[int, datetime.date, str]:
+    """
+    将天数序号转换为指定类型
+
+    Args:
+        day: 天数序号
+        output: "day" 返回天数序号，"date" 返回 datetime.date，"str" 返回 "YYYY-mm-dd" 格式的日期
+
+    Returns:
+        指定类型的日期
+    """
+    if output == "str":
+        return _to_str(day)
+    if output == "date":
+        return datetime.date.fromordinal(int(day) + _EPOCH_ORDINAL)
+    if output == "day":
+        return int(day)
+    raise ValueError(f"[ERROR]\t不支持的输出类型 {output}，只支持 {DAY_OUTPUTS}")
+
+
+def _from_day_list(days: List[int], output: str="str") -> List[Union[int, datetime.date, str]]:
+    """
+    `from_day` 的列表版本
+    """
+    if output == "day":
+        return list(days)
+    return [from_day(day, output) for day in days]
+
+
+def _to_datetime(cursor_time: Union[str, datetime.datetime, pd.Timestamp, np.datetime64]) -> datetime.datetime:
+    """
+    将时间转换为 datetime.datetime，ISO 格式字符串及 numpy datetime64 不依赖 pandas
+    """
+    if isinstance(cursor_time, datetime.datetime):
+        return cursor_time
+    if isinstance(cursor_time, str):
+        try:
+            return datetime.datetime.fromisoformat(cursor_time)
+        except ValueError:
+            pass
+    elif isinstance(cursor_time, np.datetime64):
+        return cursor_time.astype("datetime64[us]").item()
+    import pandas as pd
+    return pd.Timestamp(cursor_time)
+
+
+def _to_str(day: int) -> str:
+    """
+    将天数序号转换为 "YYYY-mm-dd" 格式的日期
+    """
+    return datetime.date.fromordinal(int(day) + _EPOCH_ORDINAL).isoformat()
+
+
+def _to_days_array(cursor_dates) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    将批量日期 (numpy datetime64 数组、pandas Series/Index、字符串列表等) 转换为天数序号数组
+
+    Returns:
+        (天数序号数组, NaT 掩码)
+    """
+    import pandas as pd
+
+    if isinstance(cursor_dates, np.ndarray) and np.issubdtype(cursor_dates.dtype, np.datetime64):
+        dates = cursor_dates.astype("datetime64[D]")
+        mask = np.isnat(dates)
+    elif pd.api.types.is_datetime64_any_dtype(getattr(cursor_dates, "dtype", None)):
+        index = pd.DatetimeIndex(cursor_dates)
+        if index.tz is not None:
+            index = index.tz_localize(None)
+        dates = index.values.astype("datetime64[D]")
+        mask = np.asarray(index.isna())
+    else:
+        values = np.asarray(cursor_dates, dtype=object) if isinstance(cursor_dates, (list, tuple)) else np.asarray(cursor_dates)
+        if values.dtype == object and pd.api.types.infer_dtype(values, skipna=False) == "integer":
+            values = values.astype(np.int64)
+        if np.issubdtype(values.dtype, np.integer):
+            days = _int_days(values.astype(np.int64).reshape(-1))
+            return days, np.zeros(days.shape, dtype=bool)
+        # 字符串等其他输入: 去重后逐个解析，与标量查询的解析规则一致
+        codes, uniques = pd.factorize(values.astype(object).reshape(-1))
+        parsed = np.array([to_day(value) for value in uniques] + [0], dtype=np.int64)
+        return parsed[codes], codes == -1
+    days = dates.astype(np.int64)
+    days[mask] = 0
+    return days, mask
+
+
+def _int_days(values: np.ndarray) -> np.ndarray:
+    """
+    `to_day` 对整数的向量化版本: 8 位整数为 YYYYmmdd，其余整数视为天数序号
+    """
+    days = values.copy()
+    is_ymd = (values >= _YYYYMMDD_MIN) & (values <= _YYYYMMDD_MAX)
+    if is_ymd.any():
+        ymd = values[is_ymd]
+        months = ((ymd // 10000 - 1970) * 12 + ymd // 100 % 100 - 1).astype("datetime64[M]")
+        dates = months.astype("datetime64[D]") + (ymd % 100 - 1).astype("timedelta64[D]")
+        # 月、日越界时 (如 20230231) 转换结果与输入不一致
+        invalid = (dates.astype("datetime64[M]") != months) | (ymd // 100 % 100 < 1) | (ymd // 100 % 100 > 12) | (ymd % 100 < 1)
+        if invalid.any():
+            raise ValueError(f"[ERROR]\t日期 {int(ymd[np.argmax(invalid)])} 格式错误，需为 YYYYmmdd 格式")
+        days[is_ymd] = dates.astype(np.int64)
+    return days
+
+
+def _from_days_array(days: np.ndarray, mask: np.ndarray, like):
+    """
+    将天数序号数组还原为与输入 like 相同的容器类型
+        - 输入为日期类型 (datetime64 数组、DatetimeIndex、datetime Series) 时输出日期类型，带时区的输入输出相同时区
+        - 输入为字符串等其他类型时输出 "YYYY-mm-dd" 格式字符串，NaT 对应 None
+    """
+    import pandas as pd
+
+    dates = days.astype("datetime64[D]")
+    dates[mask] = np.datetime64("NaT")
+    if isinstance(like, np.ndarray):
+        if np.issubdtype(like.dtype, np.datetime64):
+            return dates.astype(like.dtype)
+        strings = np.datetime_as_string(dates, unit="D")
+        # 输出宽度与输入无关 (如 "YYYYmmdd" 输入)，字符串输入没有缺失值时输出 "<U10"，否则输出 object
+        if like.dtype.kind == "U" and not mask.any():
+            return strings.astype("<U10")
+        return np.where(mask, None, strings).astype(object)
+    datetime_like = pd.api.types.is_datetime64_any_dtype(getattr(like, "dtype", None))
+    if datetime_like:
+        values = pd.DatetimeIndex(dates.astype("datetime64[ns]"))
+        # 带时区的输入按当地日期计算，输出重新设置为输入的时区
+        tz = getattr(like.dtype, "tz", None)
+        if tz is not None:
+            values = values.tz_localize(tz)
+    else:
+        values = np.where(mask, None, np.datetime_as_string(dates, unit="D")).astype(object)
+    if isinstance(like, pd.Series):
+        return pd.Series(values, index=like.index, name=like.name)
+    elif isinstance(like, pd.Index):
+        return pd.Index(values, name=like.name)
+    elif isinstance(like, tuple):
+        return tuple(values.tolist())
+    return values.tolist()
+
+
+def _to_datetime_array(cursor_times) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    将批量时间 (numpy datetime64 数组、pandas Series/Index、字符串列表等) 转换为 datetime64[ns] 数组，
+    带时区的时间保留当地时间
+
+    Returns:
+        (datetime64[ns] 数组, NaT 掩码)
+    """
+    import pandas as pd
+
+    if isinstance(cursor_times, np.ndarray) and np.issubdtype(cursor_times.dtype, np.datetime64):
+        times = cursor_times.astype("datetime64[ns]")
+    else:
+        index = pd.DatetimeIndex(pd.to_datetime(cursor_times))
+        if index.tz is not None:
+            index = index.tz_localize(None)
+        times = index.values.astype("datetime64[ns]")
+    return times, np.isnat(times)
+
+
+def _from_datetime_array(times: np.ndarray, mask: np.ndarray, like):
+    """
+    将 datetime64[ns] 数组还原为与输入 like 相同的容器类型，标量输入返回 pd.Timestamp
+    """
+    import pandas as pd
+
+    times = times.astype("datetime64[ns]")
+    times[mask] = np.datetime64("NaT")
+    if isinstance(like, pd.Series):
+        return pd.Series(times, index=like.index, name=like.name)
+    elif isinstance(like, pd.Index):
+        return pd.DatetimeIndex(times, name=like.name)
+    elif isinstance(like, np.ndarray):
+        return times
+    elif isinstance(like, (list, tuple)):
+        return type(like)(pd.DatetimeIndex(times))
+    return pd.Timestamp(times[0])
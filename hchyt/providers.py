@@ -0,0 +1,460 @@
+"""
+交易日历数据源
+    - `TushareProvider`: 通过 tushare 查询，默认数据源
+    - `FileProvider`: 读取本地 CSV/文本文件，适用于无法访问网络的环境
+    - `FakeProvider`: 进程内生成交易日历，适用于测试
+
+数据源的 `fetch` (交易日历) 及 `fetch_securities` (证券列表) 统一处理限流 (令牌桶)、
+失败重试 (有上限的指数退避) 及并发请求合并 (相同请求只查询一次)
+"""
+from __future__ import annotations
+
+import csv
+import os
+import threading
+import time
+from typing import Union, Tuple, List, Iterable, Dict, Callable
+
+import numpy as np
+
+from .dates import to_day, _to_str
+
+
+class RateLimiter:
+    """
+    令牌桶限流器，线程安全，同一限流器可在多个数据源、多个线程间共享
+        - 令牌以 rate 个/秒的速度补充，最多积累 capacity 个
+        - 令牌不足时预约令牌并在锁外等待，等待时间按预约顺序递增，先到先得
+
+    Args:
+        rate: 每秒补充的令牌数
+        capacity: 令牌桶容量，即允许的突发请求数
+    """
+
+    def __init__(self, rate: float, capacity: float=1):
+        if rate <= 0 or capacity <= 0:
+            raise ValueError(f"[ERROR]\t限流速率 {rate} 及容量 {capacity} 必须为正数")
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens: float=1) -> float:
+        """
+        获取令牌，令牌不足时阻塞等待
+
+        Returns:
+            float: 等待的秒数
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= tokens
+            wait = max(0.0, -self._tokens / self.rate)
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+
+class _Call:
+    __slots__ = ("event", "result", "error")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    合并相同 key 的并发调用: 同一时刻只有第一个调用方执行，其他调用方等待并共享其结果 (或异常)
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = dict()
+
+    def do(self, key, func: Callable):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = func()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.event.set()
+        return call.result
+
+
+_FETCH_FLIGHT = SingleFlight()
+
+# 最大重试等待秒数
+_MAX_RETRY_WAIT = 60.0
+
+
+class CalendarProvider:
+    """
+    交易日历数据源基类，子类实现 `_fetch`，按需覆盖 `key`、`coverage` 及 `_fetch_securities`
+
+    Args:
+        rate_limiter: 限流器，默认不限流
+    """
+
+    def __init__(self, rate_limiter: RateLimiter=None):
+        self.rate_limiter = rate_limiter
+
+    @property
+    def key(self) -> tuple:
+        """
+        数据源标识，标识相同的数据源的相同请求会被合并
+        """
+        return (type(self).__name__, id(self))
+
+    def coverage(self, exchange: str) -> Union[Tuple[int, int], None]:
+        """
+        数据源对指定交易所的覆盖区间 (天数序号)，None 表示不限
+        """
+        return None
+
+    def connect(self) -> None:
+        """
+        首次查询前的准备工作 (读取配置、建立连接等)，失败时不重试
+        """
+
+    def _fetch(self, exchange: str, start_day: int, end_day: int) -> np.ndarray:
+        """
+        查询 [start_day, end_day] 内的交易日，返回天数序号数组
+        """
+        raise NotImplementedError
+
+    def fetch(self, exchange: str, start_day: int, end_day: int, retries: int=3, retry_wait: float=1) -> np.ndarray:
+        """
+        查询 [start_day, end_day] 内的交易日
+            - 每次查询前从限流器获取令牌
+            - 查询失败时按 retry_wait, 2 * retry_wait, 4 * retry_wait ... (最多 60 秒) 等待后重试
+            - 多个线程同时发起相同查询时只查询一次，共享查询结果
+
+        Args:
+            exchange: 交易所代码
+            start_day: 起始日 (天数序号)
+            end_day: 截止日 (天数序号)
+            retries: 查询失败时的重试次数
+            retry_wait: 首次重试前等待的秒数
+
+        Returns:
+            np.ndarray: 有序的交易日天数序号数组
+        """
+        start_day, end_day = int(start_day), int(end_day)
+
+        def fetch_days() -> np.ndarray:
+            days = np.unique(np.asarray(self._fetch(exchange, start_day, end_day), dtype=np.int64))
+            return days[(days >= start_day) & (days <= end_day)]
+
+        key = (self.key, exchange, start_day, end_day)
+        return _FETCH_FLIGHT.do(key, lambda: self._with_retry(fetch_days, retries, retry_wait))
+
+    def _fetch_securities(self) -> List[Tuple[str, str, int, Union[int, None]]]:
+        """
+        查询证券列表 (含已退市、暂停上市)，返回 [(带交易所后缀的代码, 板块, 上市日, 退市日)]，
+        日期为天数序号，未退市的退市日为 None
+        """
+        raise NotImplementedError(f"[ERROR]\t数据源 {type(self).__name__} 不支持查询证券列表")
+
+    def fetch_securities(self, retries: int=3, retry_wait: float=1) -> List[Tuple[str, str, int, Union[int, None]]]:
+        """
+        查询证券列表，限流、重试及并发请求合并与 `fetch` 一致
+
+        Args:
+            retries: 查询失败时的重试次数
+            retry_wait: 首次重试前等待的秒数
+
+        Returns:
+            List: [(带交易所后缀的代码, 板块, 上市日, 退市日)]，见 `_fetch_securities`
+        """
+        return _FETCH_FLIGHT.do((self.key, "securities"), lambda: self._with_retry(self._fetch_securities, retries, retry_wait))
+
+    def _with_retry(self, func: Callable, retries: int, retry_wait: float):
+        self.connect()
+        for attempt in range(retries + 1):
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire()
+            try:
+                return func()
+            except NotImplementedError:
+                raise
+            except Exception:
+                if attempt == retries:
+                    raise
+            time.sleep(min(_MAX_RETRY_WAIT, retry_wait * 2 ** attempt))
+
+
+# tushare 交易日历接口默认每分钟 200 次，所有 TushareProvider 共享
+_TUSHARE_RATE_LIMITER = RateLimiter(rate=200 / 60, capacity=10)
+
+# 港交所交易日历接口单次最多返回 2000 行 (每个自然日一行)，按自然日窗口分页查询
+_HK_TRADECAL_LIMIT = 2000
+_HK_TRADECAL_WINDOW = 1500
+
+
+class TushareProvider(CalendarProvider):
+    """
+    通过 tushare 查询交易日历，支持 tushare 的 "SSE"、"SZSE"、"BSE" 等，以及港交所 "HKEX"
+        - 港交所交易日历接口单次返回行数有上限，按 1500 个自然日的窗口分页查询，每页单独限流
+        - 配置文件为 toml 格式，填入 tushare 的 token 信息，格式如下：
+        ```
+        [tushare]
+        token = xxx
+        ```
+
+    Args:
+        local_config: 本地 tushare 账户配置信息，没有指定，默认寻找 "~/.config/user_info.toml"
+        rate_limiter: 限流器，默认为所有 TushareProvider 共享的限流器
+    """
+
+    def __init__(self, local_config: str=None, rate_limiter: RateLimiter=None):
+        super().__init__(rate_limiter or _TUSHARE_RATE_LIMITER)
+        if not local_config:
+            local_config = os.path.expanduser("~") + os.sep + ".config" + os.sep + "user_info.toml"
+        self.local_config = local_config
+        self._pro = None
+        self._lock = threading.Lock()
+
+    @property
+    def key(self) -> tuple:
+        return ("tushare", os.path.abspath(self.local_config))
+
+    def connect(self) -> None:
+        with self._lock:
+            if self._pro is not None:
+                return
+            # 1. 寻找 tushare 配置信息
+            if not os.path.exists(self.local_config):
+                raise ValueError(f"[ERROR]\t没有找到本地用户配置信息，配置地址为 {self.local_config}")
+
+            # 2. 导入配置信息
+            import toml
+
+            try:
+                with open(self.local_config, "r") as f:
+                    user_info = toml.load(f)
+                if "tushare" not in user_info:
+                    raise ValueError
+            except:
+                raise ValueError(f"[ERROR]\t在本地用户配置 {self.local_config} 信息中没有找到 tushare 信息")
+
+            # 3. 设置 tushare 账户信息
+            import tushare as ts
+
+            ts.set_token(user_info["tushare"]["token"])
+            self._pro = ts.pro_api()
+
+    def _fetch(self, exchange: str, start_day: int, end_day: int) -> np.ndarray:
+        import pandas as pd
+
+        pro = self._pro
+        start_date, end_date = _to_str(start_day).replace("-", ""), _to_str(end_day).replace("-", "")
+        if exchange == "HKEX":
+            frames = []
+            for window_start in range(start_day, end_day + 1, _HK_TRADECAL_WINDOW):
+                window_end = min(window_start + _HK_TRADECAL_WINDOW - 1, end_day)
+                if window_start > start_day and self.rate_limiter is not None:
+                    self.rate_limiter.acquire()
+                page = pro.hk_tradecal(start_date=_to_str(window_start).replace("-", ""), end_date=_to_str(window_end).replace("-", ""))
+                if page is None:
+                    continue
+                if len(page) >= _HK_TRADECAL_LIMIT:
+                    raise ValueError(f"[ERROR]\t从 tushare 查询 HKEX 交易日期 [{_to_str(window_start)}, {_to_str(window_end)}]，返回行数达到上限 {_HK_TRADECAL_LIMIT}，结果可能不完整")
+                frames.append(page)
+            df = pd.concat(frames) if frames else None
+        else:
+            df = pro.trade_cal(exchange=exchange, start_date=start_date, end_date=end_date)
+        if df is None or df.empty:
+            raise ValueError(f"[ERROR]\t从 tushare 查询 {exchange} 交易日期 [{start_date}, {end_date}]，返回为空")
+        return pd.to_datetime(df.loc[df.is_open == 1, "cal_date"]).values.astype("datetime64[D]").astype(np.int64)
+
+    def _fetch_securities(self) -> List[Tuple[str, str, int, Union[int, None]]]:
+        # stock_basic 默认只返回上市状态，需分别查询上市 (L)、退市 (D)、暂停上市 (P)
+        rows = []
+        for list_status in ("L", "D", "P"):
+            df = self._pro.stock_basic(exchange="", list_status=list_status, fields="ts_code,market,list_date,delist_date")
+            if df is None:
+                continue
+            for ts_code, market, list_date, delist_date in df[["ts_code", "market", "list_date", "delist_date"]].itertuples(index=False):
+                if not isinstance(list_date, str) or not list_date:
+                    continue
+                delist_day = to_day(delist_date) if isinstance(delist_date, str) and delist_date else None
+                rows.append((ts_code, market if isinstance(market, str) else "", to_day(list_date), delist_day))
+        if not rows:
+            raise ValueError("[ERROR]\t从 tushare 查询证券列表，返回为空")
+        return rows
+
+
+class FileProvider(CalendarProvider):
+    """
+    从本地 CSV/文本文件读取交易日历
+        - 带表头的 CSV: 日期列为 "cal_date"/"trade_date"/"date" (否则为第一列)，
+          可选 "is_open" 列 (为 0 的行为非交易日) 及 "exchange" 列 (没有则所有交易所共用)
+        - 不带表头的文本: 每行一个交易日
+        - 日期支持 "YYYY-mm-dd"、"YYYYmmdd" 格式
+        - 覆盖区间为文件中 (该交易所) 的首尾日期，超出部分不会写入本地交易日历
+
+    Args:
+        path: 文件地址
+    """
+
+    _DATE_COLUMNS = ("cal_date", "trade_date", "date")
+
+    def __init__(self, path: str):
+        super().__init__()
+        if not os.path.exists(path):
+            raise ValueError(f"[ERROR]\t交易日历文件 {path} 不存在")
+        self.path = path
+        self._calendars = None
+        self._lock = threading.Lock()
+
+    @property
+    def key(self) -> tuple:
+        return ("file", os.path.abspath(self.path))
+
+    def _read(self) -> Dict[str, Tuple[np.ndarray, int, int]]:
+        """
+        读取文件，返回 {交易所 (None 为所有交易所共用): (交易日数组, 覆盖区间起始日, 覆盖区间截止日)}
+        """
+        with self._lock:
+            if self._calendars is not None:
+                return self._calendars
+            with open(self.path, newline="") as f:
+                rows = [row for row in csv.reader(f) if row and row[0].strip()]
+            if not rows:
+                raise ValueError(f"[ERROR]\t交易日历文件 {self.path} 为空")
+
+            # 1. 识别表头
+            header = [column.strip().lower() for column in rows[0]]
+            if header[0][:1].isdigit():
+                header = None
+            else:
+                rows = rows[1:]
+            date_col, open_col, exchange_col = 0, None, None
+            if header:
+                date_col = next((header.index(column) for column in self._DATE_COLUMNS if column in header), 0)
+                open_col = header.index("is_open") if "is_open" in header else None
+                exchange_col = header.index("exchange") if "exchange" in header else None
+
+            # 2. 按交易所汇总
+            days, opens = dict(), dict()
+            for row in rows:
+                exchange = row[exchange_col].strip().upper() if exchange_col is not None else None
+                days.setdefault(exchange, []).append(to_day(row[date_col].strip()))
+                opens.setdefault(exchange, []).append(open_col is None or row[open_col].strip() not in ("0", "0.0", "False", "false"))
+            calendars = dict()
+            for exchange in days:
+                exchange_days, is_open = np.array(days[exchange], dtype=np.int64), np.array(opens[exchange], dtype=bool)
+                calendars[exchange] = (np.unique(exchange_days[is_open]), int(exchange_days.min()), int(exchange_days.max()))
+            self._calendars = calendars
+            return calendars
+
+    def _lookup(self, exchange: str) -> Tuple[np.ndarray, int, int]:
+        calendars = self._read()
+        if exchange in calendars:
+            return calendars[exchange]
+        if None in calendars:
+            return calendars[None]
+        raise ValueError(f"[ERROR]\t交易日历文件 {self.path} 中没有 {exchange} 交易日历")
+
+    def coverage(self, exchange: str) -> Tuple[int, int]:
+        _, valid_from, valid_through = self._lookup(exchange)
+        return valid_from, valid_through
+
+    def _fetch(self, exchange: str, start_day: int, end_day: int) -> np.ndarray:
+        days, _, _ = self._lookup(exchange)
+        return days[(days >= start_day) & (days <= end_day)]
+
+
+class FakeProvider(CalendarProvider):
+    """
+    进程内生成交易日历，不访问网络也不读取文件，查询记录保存在 queries 中
+
+    Args:
+        trade_dates: 交易日列表，或 {交易所: 交易日列表}，默认为周一至周五剔除 holidays
+        holidays: 默认交易日历中剔除的日期
+        latency: 每次查询的模拟耗时 (秒)
+        securities: 证券列表 [(带交易所后缀的代码, 板块, 上市日期, 退市日期)]，未退市的退市日期为 None
+    """
+
+    def __init__(
+        self,
+        trade_dates: Union[Iterable, Dict[str, Iterable]]=None,
+        holidays: Iterable=(),
+        latency: float=0,
+        securities: Iterable[Tuple]=None):
+        super().__init__()
+        if isinstance(trade_dates, dict):
+            self._calendars = {exchange.upper(): np.unique([to_day(date) for date in dates]) for exchange, dates in trade_dates.items()}
+        elif trade_dates is not None:
+            self._calendars = {None: np.unique([to_day(date) for date in trade_dates])}
+        else:
+            self._calendars = None
+        self._holidays = np.unique([to_day(date) for date in holidays]).astype(np.int64)
+        self.latency = latency
+        self.securities = None if securities is None else [
+            (symbol, board, to_day(list_date), None if delist_date is None else to_day(delist_date))
+            for symbol, board, list_date, delist_date in securities
+        ]
+        self.queries = []
+        self._lock = threading.Lock()
+
+    def _fetch(self, exchange: str, start_day: int, end_day: int) -> np.ndarray:
+        with self._lock:
+            self.queries.append((exchange, _to_str(start_day), _to_str(end_day)))
+        if self.latency:
+            time.sleep(self.latency)
+        if self._calendars is None:
+            days = np.arange(start_day, end_day + 1, dtype=np.int64)
+            # 1970-01-01 为周四
+            days = days[(days + 3) % 7 < 5]
+            return np.setdiff1d(days, self._holidays)
+        days = self._calendars.get(exchange, self._calendars.get(None))
+        if days is None:
+            raise ValueError(f"[ERROR]\t没有 {exchange} 交易日历")
+        return days[(days >= start_day) & (days <= end_day)]
+
+    def _fetch_securities(self) -> List[Tuple[str, str, int, Union[int, None]]]:
+        with self._lock:
+            self.queries.append(("securities",))
+        if self.securities is None:
+            raise ValueError("[ERROR]\t没有证券列表")
+        return list(self.securities)
+
+
+_default_provider = None
+
+
+def set_calendar_provider(provider: CalendarProvider=None) -> None:
+    """
+    设置默认交易日历数据源，设置为 None 时恢复为 `TushareProvider`
+    """
+    global _default_provider
+    _default_provider = provider
+
+
+def get_calendar_provider(local_config: str=None) -> CalendarProvider:
+    """
+    默认交易日历数据源: 通过 `set_calendar_provider` 设置的数据源，没有设置时为使用 local_config 的 `TushareProvider`
+    """
+    if _default_provider is not None:
+        return _default_provider
+    return TushareProvider(local_config)
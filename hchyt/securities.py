@@ -0,0 +1,356 @@
+"""
+证券主表: 证券代码、交易所、板块及上市、退市日期，用于查询某日可交易的证券及证券在各日期是否上市
+"""
+from __future__ import annotations
+
+import csv
+import datetime
+import os
+from functools import cached_property
+from typing import TYPE_CHECKING, Union, List, Tuple, Iterable, Dict
+
+import numpy as np
+
+from .dates import to_day, _to_days_array
+from .providers import CalendarProvider, get_calendar_provider
+from .symbols import _EXCHANGE_ALIASES, _SYMBOL_FORMATS, _parse_symbol, _infer_exchange, _symbol_style, set_symbol_exchanges
+from .tradecal import CalendarCache, _config_path, _file_signature, _store_lock
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# 未退市证券的退市日
+_NOT_DELISTED = np.iinfo(np.int32).max
+
+# 证券主表文件中的列
+_SECURITY_COLUMNS = ("code", "exchange", "board", "list_day", "delist_day")
+
+
+class SecurityMaster:
+    """
+    证券主表，按列保存，每行为一个上市区间 [上市日, 退市日)
+        - code/exchange/board: 数字编码、交易所 ("SH"/"SZ"/"BJ")、板块 (如 "主板"、"创业板"、"科创板")
+        - list_day/delist_day: 上市日及退市日 (int32 天数序号)，未退市的退市日为 int32 最大值
+        - 按 (交易所, 数字编码, 上市日) 排序，同一证券退市后重新上市时有多个上市区间
+        - 某日的证券列表及证券在各日期是否上市均为向量化查询
+
+    Args:
+        code: 数字编码数组
+        exchange: 交易所数组
+        board: 板块数组
+        list_day: 上市日数组
+        delist_day: 退市日数组
+    """
+
+    def __init__(self, code: np.ndarray, exchange: np.ndarray, board: np.ndarray, list_day: np.ndarray, delist_day: np.ndarray):
+        order = np.lexsort((list_day, code, exchange))
+        self.code = np.asarray(code, dtype=str)[order]
+        self.exchange = np.asarray(exchange, dtype=str)[order]
+        self.board = np.asarray(board, dtype=str)[order]
+        self.list_day = np.asarray(list_day, dtype=np.int32)[order]
+        self.delist_day = np.asarray(delist_day, dtype=np.int32)[order]
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Tuple[str, str, Union[str, int, datetime.date], Union[str, int, datetime.date, None]]]) -> "SecurityMaster":
+        """
+        由 [(标的代码, 板块, 上市日期, 退市日期)] 构造证券主表，标的代码没有交易所标识时按前缀推断，未退市的退市日期为 None
+        """
+        columns = ([], [], [], [], [])
+        for symbol, board, list_date, delist_date in rows:
+            code, exchange = _parse_symbol(symbol)
+            columns[0].append(code)
+            columns[1].append(exchange or _infer_exchange(code))
+            columns[2].append(board or "")
+            columns[3].append(to_day(list_date))
+            columns[4].append(_NOT_DELISTED if delist_date is None else to_day(delist_date))
+        if not columns[0]:
+            raise ValueError("[ERROR]\t证券列表为空")
+        return cls(*columns)
+
+    def __len__(self) -> int:
+        return len(self.code)
+
+    @cached_property
+    def _rows(self) -> Dict[str, Tuple[int, int]]:
+        """
+        "数字编码.交易所" 及只出现在一个交易所的数字编码 -> 行区间 [lo, hi)
+        """
+        keys = np.char.add(np.char.add(self.code, "."), self.exchange)
+        starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+        stops = np.r_[starts[1:], len(keys)]
+        rows = {key: (int(lo), int(hi)) for key, lo, hi in zip(keys[starts].tolist(), starts, stops)}
+        codes, counts = np.unique(self.code[starts], return_counts=True)
+        unique_codes = set(codes[counts == 1].tolist())
+        for code, lo, hi in zip(self.code[starts].tolist(), starts, stops):
+            if code in unique_codes:
+                rows[code] = (int(lo), int(hi))
+        return rows
+
+    @cached_property
+    def _max_intervals(self) -> int:
+        return max(hi - lo for lo, hi in self._rows.values())
+
+    def exchanges(self) -> Dict[str, str]:
+        """
+        只出现在一个交易所的数字编码 -> 交易所，用于 `set_symbol_exchanges`
+        """
+        return {code: str(self.exchange[lo]) for code, (lo, _) in self._rows.items() if "." not in code}
+
+    def _lookup(self, symbols: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        标的代码对应的行区间，不在证券主表中的标的行区间为空
+        """
+        import pandas as pd
+
+        codes, uniques = pd.factorize(symbols)
+        bounds = np.zeros((len(uniques) + 1, 2), dtype=np.int64)
+        for i, symbol in enumerate(uniques.tolist()):
+            code, exchange = _parse_symbol(symbol)
+            bounds[i] = self._rows.get(f"{code}.{exchange}" if exchange else code, (0, 0))
+        bounds = bounds[codes]
+        return bounds[:, 0], bounds[:, 1]
+
+    def listed_days(self, days: Union[int, np.ndarray]) -> np.ndarray:
+        """
+        每行在各日期是否处于上市区间内，days 为标量时返回 (行数,) 的数组，否则返回 (日期数, 行数) 的数组
+        """
+        days = np.asarray(days, dtype=np.int64)
+        if days.ndim == 0:
+            return (self.list_day <= days) & (days < self.delist_day)
+        return (self.list_day <= days[:, np.newaxis]) & (days[:, np.newaxis] < self.delist_day)
+
+    def universe(
+        self,
+        cursor_date: Union[str, int, datetime.date, pd.Timestamp],
+        exchange: str=None,
+        board: str=None,
+        style: str="ts") -> List[str]:
+        """
+        查询指定日期处于上市状态的证券
+
+        Args:
+            cursor_date: 指定日期
+            exchange: 交易所，支持 "SH"/"SSE"/"XSHG" 等写法，默认为所有交易所
+            board: 板块，如 "主板"、"创业板"、"科创板"，默认为所有板块
+            style: 标的编码风格，与 `fmt_symbols` 一致，默认为 tushare 风格
+
+        Returns:
+            List[str]: 按交易所、数字编码排序的标的代码列表
+        """
+        mask = self.listed_days(to_day(cursor_date))
+        if exchange is not None:
+            if exchange.upper() not in _EXCHANGE_ALIASES:
+                raise ValueError(f"[ERROR]\t不支持的交易所 {exchange}")
+            mask &= self.exchange == _EXCHANGE_ALIASES[exchange.upper()]
+        if board is not None:
+            mask &= self.board == board
+        formats = _SYMBOL_FORMATS[_symbol_style(style)]
+        return [formats[exchange].format(code) for code, exchange in zip(self.code[mask].tolist(), self.exchange[mask].tolist())]
+
+    def is_listed(
+        self,
+        symbols: Union[str, Iterable[str]],
+        cursor_dates: Union[str, int, datetime.date, pd.Timestamp, Iterable]) -> Union[bool, np.ndarray]:
+        """
+        查询证券在各日期是否处于上市状态，[上市日, 退市日) 内为上市状态，不在证券主表中的证券均为 False
+            - 单个证券 + 多个日期: 该证券在每个日期是否上市
+            - 多个证券 + 单个日期: 每个证券在该日期是否上市
+            - 多个证券 + 多个日期: 长度需一致，逐个对应查询
+
+        Args:
+            symbols: 标的代码或标的代码序列，没有交易所标识时按数字编码查询
+            cursor_dates: 日期或日期序列
+
+        Returns:
+            单个证券及单个日期时返回 bool，否则返回 bool 数组
+        """
+        scalar_symbol, scalar_date = isinstance(symbols, str), np.ndim(cursor_dates) == 0
+        if scalar_date:
+            days, mask = np.array([to_day(cursor_dates)], dtype=np.int64), np.zeros(1, dtype=bool)
+        else:
+            days, mask = _to_days_array(cursor_dates)
+        lo, hi = self._lookup(np.array([symbols] if scalar_symbol else list(symbols), dtype=object))
+        if not scalar_symbol and not scalar_date and len(lo) != len(days):
+            raise ValueError(f"[ERROR]\t标的数目 {len(lo)} 与日期数目 {len(days)} 不一致")
+
+        # 按上市区间序号逐个检查，绝大多数证券只有一个上市区间
+        listed = np.zeros(np.broadcast_shapes(lo.shape, days.shape), dtype=bool)
+        for k in range(self._max_intervals):
+            rows = lo + k
+            valid = rows < hi
+            rows = np.where(valid, rows, 0)
+            listed |= valid & (self.list_day[rows] <= days) & (days < self.delist_day[rows])
+        listed &= ~mask
+        if scalar_symbol and scalar_date:
+            return bool(listed[0])
+        return listed
+
+    def to_frame(self) -> pd.DataFrame:
+        """
+        转换为 pandas DataFrame，日期列为 datetime64，未退市的退市日期为 NaT
+        """
+        import pandas as pd
+
+        delisted = self.delist_day != _NOT_DELISTED
+        delist_date = np.where(delisted, self.delist_day, 0).astype("datetime64[D]").astype("datetime64[ns]")
+        delist_date[~delisted] = np.datetime64("NaT")
+        return pd.DataFrame({
+            "code": self.code,
+            "exchange": self.exchange,
+            "board": self.board,
+            "list_date": self.list_day.astype("datetime64[D]").astype("datetime64[ns]"),
+            "delist_date": delist_date,
+        })
+
+
+def _read_security_file(path: str) -> List[Tuple[str, str, int, Union[int, None]]]:
+    """
+    读取本地证券列表 CSV 文件 (如 tushare stock_basic 导出的文件)
+        - 代码列为 "ts_code" (否则为 "symbol" 列，有 "exchange" 列时拼接交易所)
+        - 板块列为 "market"/"board"，可选
+        - 上市日期列 "list_date"，退市日期列 "delist_date" (为空表示未退市)
+    """
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        reader = csv.DictReader(f)
+        columns = set(reader.fieldnames or [])
+        if "list_date" not in columns or not columns & {"ts_code", "symbol"}:
+            raise ValueError(f"[ERROR]\t证券列表文件 {path} 需要包含 ts_code (或 symbol) 及 list_date 列")
+        board_col = next((column for column in ("market", "board") if column in columns), None)
+        rows = []
+        for row in reader:
+            symbol = row["ts_code"] if "ts_code" in columns else row["symbol"] + "." + row.get("exchange", "")
+            if not row["list_date"].strip():
+                continue
+            delist_date = (row.get("delist_date") or "").strip()
+            rows.append((symbol.strip(), row[board_col].strip() if board_col else "", to_day(row["list_date"].strip()), to_day(delist_date) if delist_date else None))
+    return rows
+
+
+def gen_securities(
+    output: str=None,
+    local_config: str=None,
+    source: str=None,
+    retries: int=3,
+    retry_wait: float=1,
+    provider: CalendarProvider=None) -> None:
+    """
+    生成本地证券主表文件
+        1. 指定 source 时读取本地证券列表 CSV 文件 (格式见 `_read_security_file`)，不访问网络
+        2. 否则从 provider 查询 (tushare 为 stock_basic 接口，包含已退市、暂停上市的证券)，
+           没有指定时使用默认数据源，见 `gen_trade_calendar`
+        3. 证券主表按列以 numpy npz 格式保存，先写入临时文件再整体替换
+
+    Args:
+        output: 本地证券主表文件地址，默认为 "~/.config/securities.npz"
+        local_config: 本地 tushare 账户配置信息，没有指定，默认寻找 "~/.config/user_info.toml"
+        source: 本地证券列表 CSV 文件
+        retries: 查询失败时的重试次数
+        retry_wait: 首次重试前等待的秒数
+        provider: 数据源
+
+    Returns:
+        None
+    """
+    output = output or _config_path("securities.npz")
+    if source is not None:
+        rows = _read_security_file(source)
+    else:
+        try:
+            rows = (provider or get_calendar_provider(local_config)).fetch_securities(retries, retry_wait)
+        except NotImplementedError as e:
+            raise ValueError(f"{e}，请通过 source 指定本地证券列表文件") from e
+    master = SecurityMaster.from_rows(rows)
+
+    with _store_lock(output):
+        tmp_output = f"{output}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_output, "wb") as f:
+                np.savez(f, **{column: getattr(master, column) for column in _SECURITY_COLUMNS})
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_output, output)
+        finally:
+            if os.path.exists(tmp_output):
+                os.remove(tmp_output)
+    security_cache.invalidate()
+
+
+def _load_securities(local_file: str, _: str=None) -> Tuple[SecurityMaster, str, Tuple[int, int, int]]:
+    """
+    导入本地证券主表文件，返回 (证券主表, 文件地址, 读取前的文件签名)，默认文件不存在时进行网络获取
+    """
+    if not os.path.exists(local_file):
+        if local_file != os.path.abspath(_config_path("securities.npz")):
+            raise ValueError(f"[ERROR]\t证券主表文件 {local_file} 不存在")
+        gen_securities(output=local_file)
+    signature = _file_signature(local_file)
+    with np.load(local_file, allow_pickle=False) as data:
+        missing = [column for column in _SECURITY_COLUMNS if column not in data.files]
+        if missing:
+            raise ValueError(f"[ERROR]\t证券主表文件 {local_file} 格式错误，缺少 {missing}")
+        master = SecurityMaster(*(data[column] for column in _SECURITY_COLUMNS))
+    return master, local_file, signature
+
+
+security_cache = CalendarCache(_load_securities)
+_registered_master = None
+
+
+def load_securities(local_file: str=None, register: bool=False) -> SecurityMaster:
+    """
+    导入本地证券主表，默认文件不存在时进行网络获取，文件更新后自动重新导入 (见 `CalendarCache`)
+
+    Args:
+        local_file: 本地证券主表文件，默认为 "~/.config/securities.npz"
+        register: 是否将证券的准确交易所登记到 `fmt_symbols` (见 `set_symbol_exchanges`)，默认不登记，
+            登记会改变全局的标的代码格式化结果
+
+    Returns:
+        SecurityMaster: 证券主表
+    """
+    global _registered_master
+    master = security_cache.get(os.path.abspath(local_file or _config_path("securities.npz")))
+    if register and master is not _registered_master:
+        set_symbol_exchanges(master.exchanges())
+        _registered_master = master
+    return master
+
+
+def get_universe(
+    cursor_date: Union[str, int, datetime.date, pd.Timestamp],
+    exchange: str=None,
+    board: str=None,
+    style: str="ts",
+    local_file: str=None) -> List[str]:
+    """
+    查询指定日期处于上市状态的证券，见 `SecurityMaster.universe`
+
+    Args:
+        cursor_date: 指定日期
+        exchange: 交易所，默认为所有交易所
+        board: 板块，默认为所有板块
+        style: 标的编码风格，默认为 tushare 风格
+        local_file: 本地证券主表文件
+
+    Returns:
+        List[str]: 标的代码列表
+    """
+    return load_securities(local_file, register=False).universe(cursor_date, exchange, board, style)
+
+
+def is_listed(
+    symbols: Union[str, Iterable[str]],
+    cursor_dates: Union[str, int, datetime.date, pd.Timestamp, Iterable],
+    local_file: str=None) -> Union[bool, np.ndarray]:
+    """
+    查询证券在各日期是否处于上市状态，见 `SecurityMaster.is_listed`
+
+    Args:
+        symbols: 标的代码或标的代码序列
+        cursor_dates: 日期或日期序列
+        local_file: 本地证券主表文件
+
+    Returns:
+        单个证券及单个日期时返回 bool，否则返回 bool 数组
+    """
+    return load_securities(local_file, register=False).is_listed(symbols, cursor_dates)
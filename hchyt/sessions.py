@@ -0,0 +1,347 @@
+"""
+交易时间段及交易分钟时钟
+"""
+from __future__ import annotations
+
+import datetime
+from bisect import bisect_right
+from functools import lru_cache
+from typing import TYPE_CHECKING, Union, List
+
+import numpy as np
+
+from .dates import to_day, _to_datetime, _to_datetime_array, _from_datetime_array
+from .tradecal import TradingCalendar, load_calendar, _normalize_exchange
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# 交易时间段边界，相邻边界之间 (左闭右开) 对应的交易时间段为 _SESSION_NAMES 中的同位置元素
+_SESSION_TIMES = [
+    datetime.time(9, 15), # 0
+    datetime.time(9, 20), # 1
+    datetime.time(9, 25), # 2
+    datetime.time(9, 30), # 3
+    datetime.time(11, 30), # 4
+    datetime.time(13, 00), # 5
+    datetime.time(14, 57), # 6
+    datetime.time(15, 0), # 7
+]
+_SESSION_NAMES = ["others", "auction1", "auction2", "auction3", "continuous", "others", "continuous", "auction4", "others"]
+_SESSION_CATEGORIES = ["auction1", "auction2", "auction3", "auction4", "continuous", "others"]
+_SESSION_BOUNDS = np.array([(t.hour * 3600 + t.minute * 60 + t.second) * 10**9 for t in _SESSION_TIMES], dtype=np.int64)
+_SESSION_CODES = np.array([_SESSION_CATEGORIES.index(name) for name in _SESSION_NAMES], dtype=np.int8)
+
+# 以上交易时间段为 A 股交易时间段，只适用于以下交易所及其交易日历的并集/交集
+_SESSION_EXCHANGES = ("SSE", "SZSE", "BSE", "UNION", "INTERSECTION")
+
+
+def _check_exchange(exchange: str=None) -> str:
+    """
+    检查交易所的交易时间段是否已支持，返回格式化后的交易所代码
+    """
+    exchange = _normalize_exchange(exchange)
+    if exchange not in _SESSION_EXCHANGES:
+        raise ValueError(f"[ERROR]\t不支持 {exchange} 的交易时间段，只支持 {', '.join(_SESSION_EXCHANGES)}")
+    return exchange
+
+
+def get_trade_time_type(
+    cursor_time: Union[str, datetime.datetime, datetime.time, pd.Timestamp] = None,
+    exchange: str=None,
+    local_cal: str=None,
+) -> str:
+    """
+    查询指定时间所处交易时间段
+        - "auction1": 9:15 ~ 9:20 可挂可撤
+        - "auction2": 9:20 ~ 9:25 可挂不可撤
+        - "auction3": 9:25 ~ 9:30 接收挂单，实际开盘价在 9:25
+        - "auction4": 14:57 ~ 15:00 可挂不可撤
+        - "continuous": 9:30 ~ 11:30/13:00 ~ 14:57 连续竞价
+        - "others": 其他非交易时间
+
+    Args:
+        time_str: 指定时间, 默认为当前时间
+        exchange: 交易所代码，默认为 "SSE"，"UNION"/"INTERSECTION" 为所有交易所交易日历在共同覆盖区间上的并集/交集，
+            交易时间段只支持 A 股交易所，其他交易所 (如 "HKEX") 抛出 ValueError
+        local_cal: 本地日历文件，默认为 ~/.config/trade_cal.bin
+
+    Returns:
+        str: 当前时间所处交易时间段
+    """
+    # 1. 指定时间格式化处理
+    if not cursor_time:
+        cursor_time = datetime.datetime.now().time()
+        cursor_date = datetime.date.today()
+    elif isinstance(cursor_time, datetime.time):
+        cursor_date = datetime.date.today()
+    else:
+        if not isinstance(cursor_time, datetime.datetime):
+            cursor_time = _to_datetime(cursor_time)
+        cursor_date = cursor_time.date()
+        cursor_time = cursor_time.time()
+
+    # 2. 判断时间所处时间段
+    if cursor_date not in load_calendar(local_cal, _check_exchange(exchange)):
+        return "others"
+    return _SESSION_NAMES[bisect_right(_SESSION_TIMES, cursor_time)]
+
+
+def get_trade_time_types(
+    cursor_times: Union[np.ndarray, pd.Series, pd.Index, List[str]],
+    exchange: str=None,
+    local_cal: str=None,
+) -> Union[pd.Series, pd.Categorical]:
+    """
+    `get_trade_time_type` 的向量化版本，对每个时间查询所处交易时间段
+        - 交易日判断为对交易日历的批量二分查找，时间段判断为对交易时间段边界的 searchsorted
+        - 输入为 Series 时返回相同索引的 category 类型 Series，其他输入返回 pd.Categorical
+        - 缺失值 (NaT) 对应的交易时间段为缺失值
+
+    Args:
+        cursor_times: 时间序列，支持 numpy datetime64 数组、pandas Series/Index、字符串列表
+        exchange: 交易所代码，默认为 "SSE"，"UNION"/"INTERSECTION" 为所有交易所交易日历在共同覆盖区间上的并集/交集，
+            交易时间段只支持 A 股交易所，其他交易所 (如 "HKEX") 抛出 ValueError
+        local_cal: 本地日历文件，默认为 ~/.config/trade_cal.bin
+
+    Returns:
+        category 类型的交易时间段，类别为 "auction1"/"auction2"/"auction3"/"auction4"/"continuous"/"others"
+    """
+    # 1. 拆分为日期 (天数序号) 及日内时间 (纳秒)
+    times, mask = _to_datetime_array(cursor_times)
+    dates = times.astype("datetime64[D]")
+    time_of_day = (times - dates).astype(np.int64)
+
+    # 2. 判断交易日及所处时间段
+    codes = _SESSION_CODES[np.searchsorted(_SESSION_BOUNDS, time_of_day, side="right")]
+    is_trade_date = load_calendar(local_cal, _check_exchange(exchange)).contains_days(dates.astype(np.int64))
+    codes = np.where(is_trade_date, codes, _SESSION_CATEGORIES.index("others"))
+    codes[mask] = -1
+
+    import pandas as pd
+
+    sessions = pd.Categorical.from_codes(codes, categories=_SESSION_CATEGORIES)
+    if isinstance(cursor_times, pd.Series):
+        return pd.Series(sessions, index=cursor_times.index, name=cursor_times.name)
+    return sessions
+
+
+# 连续交易的时间段 (左闭右开)，上午为 9:30 ~ 11:30，下午为 13:00 ~ 15:00 (含尾盘集合竞价)
+_TRADING_SESSIONS = [(_SESSION_TIMES[3], _SESSION_TIMES[4]), (_SESSION_TIMES[5], _SESSION_TIMES[7])]
+_MINUTE_NS = 60 * 10**9
+
+
+class TradingClock:
+    """
+    交易分钟时钟，由交易日历及交易时间段 (A 股交易时间段) 构成
+        - 所有交易日的交易时间首尾相接构成连续的"交易时间轴"，午休、夜间及非交易日在轴上长度为 0
+        - K 线时间索引生成、交易分钟序号、交易分钟加减均为交易时间轴上的向量化运算
+        - label 为 "left" 时以分钟 (K 线) 起始时间标记，为 "right" 时以结束时间标记 (如 9:31 ~ 11:30、13:01 ~ 15:00)，
+          两者在午休及收盘边界处的取值不同: "left" 下 11:30 等同于 13:00、15:00 等同于下一交易日 9:30，
+          "right" 下 13:00 等同于 11:30、9:30 等同于上一交易日 15:00
+
+    Args:
+        calendar: 交易日历
+    """
+
+    def __init__(self, calendar: TradingCalendar):
+        self.calendar = calendar
+        opens = np.array([(start.hour * 60 + start.minute) * _MINUTE_NS for start, _ in _TRADING_SESSIONS], dtype=np.int64)
+        closes = np.array([(end.hour * 60 + end.minute) * _MINUTE_NS for _, end in _TRADING_SESSIONS], dtype=np.int64)
+        self._opens = opens
+        self._lengths = closes - opens
+        # 每个交易时间段在交易日内的起始交易时间
+        self._session_starts = np.concatenate([[0], np.cumsum(self._lengths)[:-1]])
+        self.day_ns = int(self._lengths.sum())
+        self.minutes_per_day = self.day_ns // _MINUTE_NS
+        self._bar_index = lru_cache(maxsize=128)(self._build_bar_index)
+
+    def _elapsed(self, times: np.ndarray, mask: np.ndarray) -> np.ndarray:
+        """
+        将时间映射为交易时间轴上的位置 (纳秒)，即自交易日历第一个交易日开盘起经过的交易时间
+        """
+        dates = times.astype("datetime64[D]")
+        days = dates.astype(np.int64)
+        time_of_day = (times - dates).astype(np.int64)
+        outside = ~mask & ((days < self.calendar.days[0]) | (days > self.calendar.days[-1]))
+        if outside.any():
+            raise ValueError(f"[ERROR]\t时间 {times[np.argmax(outside)]} 超出交易日历范围 [{self.calendar.first}, {self.calendar.last}]")
+        pos, member = self.calendar._locate(days)
+        within = np.zeros(times.shape, dtype=np.int64)
+        for open_ns, length in zip(self._opens, self._lengths):
+            within += np.clip(time_of_day - open_ns, 0, length)
+        # 非交易日位于下一交易日开盘处
+        return pos * self.day_ns + np.where(member, within, 0)
+
+    def _from_elapsed(self, elapsed: np.ndarray, mask: np.ndarray, label: str) -> np.ndarray:
+        """
+        将交易时间轴上的位置 (纳秒) 还原为 datetime64[ns] 时间
+        """
+        if label == "left":
+            pos, rem = np.divmod(elapsed, self.day_ns)
+            session = np.searchsorted(self._session_starts, rem, side="right") - 1
+        elif label == "right":
+            pos = -(-elapsed // self.day_ns) - 1
+            rem = elapsed - pos * self.day_ns
+            session = np.searchsorted(self._session_starts, rem, side="left") - 1
+        else:
+            raise ValueError(f"[ERROR]\t不支持的标记方式 {label}，只支持 'left' 或 'right'")
+        outside = ~mask & ((pos < 0) | (pos >= len(self.calendar.days)))
+        if outside.any():
+            raise ValueError(f"[ERROR]\t交易时间超出交易日历范围 [{self.calendar.first}, {self.calendar.last}]")
+        pos = np.clip(pos, 0, len(self.calendar.days) - 1)
+        session = np.clip(session, 0, len(self._opens) - 1)
+        time_of_day = self._opens[session] + rem - self._session_starts[session]
+        return (self.calendar.days[pos].astype(np.int64) * 86400 * 10**9 + time_of_day).astype("datetime64[ns]")
+
+    def _build_bar_index(self, start_day: int, end_day: int, freq: int, label: str) -> pd.DatetimeIndex:
+        import pandas as pd
+
+        offsets = []
+        for open_ns, length in zip(self._opens, self._lengths):
+            starts = np.arange(0, length, freq * _MINUTE_NS, dtype=np.int64)
+            offsets.append(open_ns + (starts if label == "left" else np.minimum(starts + freq * _MINUTE_NS, length)))
+        offsets = np.concatenate(offsets)
+        lo = np.searchsorted(self.calendar.days, start_day, side="left")
+        hi = np.searchsorted(self.calendar.days, end_day, side="right")
+        days = self.calendar.days[lo:hi].astype(np.int64) * 86400 * 10**9
+        return pd.DatetimeIndex((days[:, None] + offsets[None, :]).ravel().astype("datetime64[ns]"))
+
+    def bar_index(
+        self,
+        start_date: Union[str, datetime.date, pd.Timestamp],
+        end_date: Union[str, datetime.date, pd.Timestamp],
+        freq: Union[int, str]=1,
+        label: str="right") -> pd.DatetimeIndex:
+        """
+        生成 [start_date, end_date] 内所有交易日的 K 线时间索引，同一参数的结果会被缓存
+            - 每个交易时间段内从开盘起每 freq 分钟一根 K 线，最后一根 K 线在交易时间段结束处截断
+
+        Args:
+            start_date: 开始日期
+            end_date: 结束日期
+            freq: K 线周期，整数为分钟数，也支持 "5min"、"30min" 等字符串
+            label: "left" 以 K 线起始时间标记，"right" (默认) 以 K 线结束时间标记
+
+        Returns:
+            pd.DatetimeIndex: K 线时间索引
+        """
+        if label not in ("left", "right"):
+            raise ValueError(f"[ERROR]\t不支持的标记方式 {label}，只支持 'left' 或 'right'")
+        if not isinstance(freq, int):
+            import pandas as pd
+
+            freq_ns = pd.Timedelta(freq).value
+            if freq_ns % _MINUTE_NS:
+                raise ValueError(f"[ERROR]\tK 线周期 {freq} 必须为整数分钟")
+            freq = freq_ns // _MINUTE_NS
+        if freq <= 0:
+            raise ValueError(f"[ERROR]\tK 线周期 {freq} 必须为正数")
+        return self._bar_index(to_day(start_date), to_day(end_date), int(freq), label)
+
+    def minute_ordinals(self, cursor_times, label: str="left"):
+        """
+        查询时间所在交易分钟的序号，序号自交易日历第一个交易日的第一个交易分钟起计数，每个交易日 minutes_per_day 个
+            - label 为 "left" 时，时间属于其所在的 [t, t + 1min) 交易分钟，非交易时间属于之后的第一个交易分钟
+            - label 为 "right" 时，时间属于其所在的 (t - 1min, t] 交易分钟，非交易时间属于之前的最后一个交易分钟
+
+        Args:
+            cursor_times: 时间或时间序列，支持 numpy datetime64 数组、pandas Series/Index、字符串列表
+            label: 交易分钟的标记方式
+
+        Returns:
+            交易分钟序号，标量输入返回 int，其他输入返回 numpy int64 数组 (NaT 对应 -1)
+        """
+        times, mask = _to_datetime_array([cursor_times] if np.ndim(cursor_times) == 0 else cursor_times)
+        elapsed = self._elapsed(times, mask)
+        if label == "left":
+            ordinals = elapsed // _MINUTE_NS
+        elif label == "right":
+            ordinals = -(-elapsed // _MINUTE_NS) - 1
+        else:
+            raise ValueError(f"[ERROR]\t不支持的标记方式 {label}，只支持 'left' 或 'right'")
+        ordinals[mask] = -1
+        return int(ordinals[0]) if np.ndim(cursor_times) == 0 else ordinals
+
+    def from_minute_ordinals(self, ordinals, label: str="left"):
+        """
+        `minute_ordinals` 的逆运算，返回交易分钟的起始 ("left") 或结束 ("right") 时间
+        """
+        import pandas as pd
+
+        values = np.asarray(ordinals, dtype=np.int64).reshape(-1)
+        mask = values < 0
+        offset = 0 if label == "left" else 1
+        times = self._from_elapsed((values + offset) * _MINUTE_NS, mask, label)
+        times[mask] = np.datetime64("NaT")
+        return pd.Timestamp(times[0]) if np.ndim(ordinals) == 0 else pd.DatetimeIndex(times)
+
+    def shift_minutes(self, cursor_times, n: int, label: str="right"):
+        """
+        将时间在交易时间轴上加减 n 个交易分钟，自动跳过午休、夜间及非交易日
+
+        Args:
+            cursor_times: 时间或时间序列，支持 numpy datetime64 数组、pandas Series/Index、字符串列表
+            n: 交易分钟数，正数往未来推演，负数往历史回溯
+            label: 结果落在交易时间段边界时的取值方式，见类说明
+
+        Returns:
+            与输入相同容器类型的时间，标量输入返回 pd.Timestamp
+        """
+        times, mask = _to_datetime_array([cursor_times] if np.ndim(cursor_times) == 0 else cursor_times)
+        elapsed = self._elapsed(times, mask) + int(n) * _MINUTE_NS
+        return _from_datetime_array(self._from_elapsed(elapsed, mask, label), mask, cursor_times)
+
+
+@lru_cache(maxsize=16)
+def _calendar_clock(calendar: TradingCalendar) -> TradingClock:
+    return TradingClock(calendar)
+
+
+def load_clock(local_cal: str=None, exchange: str=None) -> TradingClock:
+    """
+    导入指定交易所的交易日历，并构造为 `TradingClock` 对象，交易日历重新导入后自动重新构造
+
+    Args:
+        local_cal: 本地日历文件，默认为 ~/.config/trade_cal.bin
+        exchange: 交易所代码，默认为 "SSE"，交易时间段只支持 A 股交易所，其他交易所抛出 ValueError
+    """
+    return _calendar_clock(load_calendar(local_cal, _check_exchange(exchange)))
+
+
+def get_bar_index(
+    start_date: Union[str, datetime.date, pd.Timestamp],
+    end_date: Union[str, datetime.date, pd.Timestamp],
+    freq: Union[int, str]=1,
+    label: str="right",
+    exchange: str=None) -> pd.DatetimeIndex:
+    """
+    生成 [start_date, end_date] 内所有交易日的分钟 K 线时间索引，见 `TradingClock.bar_index`
+
+    Args:
+        start_date: 开始日期
+        end_date: 结束日期
+        freq: K 线周期，整数为分钟数，也支持 "5min"、"30min" 等字符串
+        label: "left" 以 K 线起始时间标记，"right" (默认) 以 K 线结束时间标记
+        exchange: 交易所代码，默认为 "SSE"，只支持 A 股交易所
+
+    Returns:
+        pd.DatetimeIndex: K 线时间索引
+    """
+    return load_clock(exchange=exchange).bar_index(start_date, end_date, freq, label)
+
+
+def shift_trade_minutes(cursor_times, n: int, label: str="right", exchange: str=None):
+    """
+    将时间加减 n 个交易分钟，自动跳过午休、夜间及非交易日，见 `TradingClock.shift_minutes`
+
+    Args:
+        cursor_times: 时间或时间序列，支持 numpy datetime64 数组、pandas Series/Index、字符串列表
+        n: 交易分钟数，正数往未来推演，负数往历史回溯
+        label: 结果落在交易时间段边界时的取值方式，"right" (默认) 下 11:30 后一分钟为 13:01
+        exchange: 交易所代码，默认为 "SSE"，只支持 A 股交易所
+
+    Returns:
+        与输入相同容器类型的时间，标量输入返回 pd.Timestamp
+    """
+    return load_clock(exchange=exchange).shift_minutes(cursor_times, n, label)
@@ -0,0 +1,169 @@
+"""
+标的代码格式化
+"""
+from __future__ import annotations
+
+import re
+from functools import lru_cache
+from typing import TYPE_CHECKING, Union, List, Tuple, Dict
+
+import numpy as np
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# 标的编码中的数字及交易所标识
+_DIGIT_PAT = re.compile(r"\d+")
+_EXCHANGE_PAT = re.compile(r"[A-Za-z]+")
+_EXCHANGE_ALIASES = {
+    "SH": "SH", "SHSE": "SH", "XSHG": "SH", "SSE": "SH",
+    "SZ": "SZ", "SZSE": "SZ", "XSHE": "SZ",
+    "BJ": "BJ", "BJSE": "BJ", "BSE": "BJ",
+}
+# 没有交易所标识时，按数字编码前缀推断交易所，前缀越长越优先
+#   - 北交所: 4/8 开头，及 92 开头的新代码
+#   - 上交所: 6 开头 (含 68 科创板)，5 开头基金，9 开头 B 股，11 开头债券
+#   - 深交所: 其他 (含 30 创业板)
+_EXCHANGE_PREFIXES = (("92", "BJ"), ("11", "SH"), ("4", "BJ"), ("8", "BJ"), ("6", "SH"), ("5", "SH"), ("9", "SH"))
+# 证券主表登记的数字编码 -> 交易所，优先于按前缀推断，见 `set_symbol_exchanges`
+_SYMBOL_EXCHANGES = dict()
+_SYMBOL_STYLES = {
+    None: "bare", "bare": "bare",
+    "gm": "gm", "goldminer": "gm",
+    "ts": "ts", "tushare": "ts", "wd": "ts", "wind": "ts",
+    "jq": "jq", "joinquant": "jq",
+}
+_SYMBOL_FORMATS = {
+    "bare": {"SH": "{}", "SZ": "{}", "BJ": "{}"},
+    "gm": {"SH": "SHSE.{}", "SZ": "SZSE.{}", "BJ": "BJSE.{}"},
+    "ts": {"SH": "{}.SH", "SZ": "{}.SZ", "BJ": "{}.BJ"},
+    "jq": {"SH": "{}.XSHG", "SZ": "{}.XSHE", "BJ": "{}.BJSE"},
+}
+
+
+def _symbol_style(style: str) -> str:
+    """
+    标的编码风格格式化
+    """
+    if style not in _SYMBOL_STYLES:
+        raise ValueError("[ERROR]\t不支持的编码风格")
+    return _SYMBOL_STYLES[style]
+
+
+def set_symbol_exchanges(exchanges: Dict[str, str]=None) -> None:
+    """
+    登记数字编码对应的准确交易所，标的代码中没有交易所标识时优先使用登记的交易所，
+    没有登记的编码仍按前缀推断，`load_securities(register=True)` 导入证券主表时登记
+
+    Args:
+        exchanges: 数字编码 -> 交易所 (如 "SH"、"SSE"、"XSHG")，None 清空登记
+    """
+    global _SYMBOL_EXCHANGES
+    mapping = dict()
+    for code, exchange in (exchanges or dict()).items():
+        if exchange.upper() not in _EXCHANGE_ALIASES:
+            raise ValueError(f"[ERROR]\t不支持的交易所 {exchange}")
+        mapping[code] = _EXCHANGE_ALIASES[exchange.upper()]
+    _SYMBOL_EXCHANGES = mapping
+    _fmt_symbol.cache_clear()
+
+
+@lru_cache(maxsize=1 << 16)
+def _parse_symbol(symbol: str) -> Tuple[str, Union[str, None]]:
+    """
+    解析标的代码，返回 (数字编码, 交易所标识)，没有交易所标识时交易所为 None
+    """
+    digits = _DIGIT_PAT.search(symbol)
+    if digits is None:
+        raise ValueError(f"[ERROR]\t标的代码 {symbol} 中没有数字编码")
+    for token in _EXCHANGE_PAT.findall(symbol):
+        exchange = _EXCHANGE_ALIASES.get(token.upper())
+        if exchange:
+            return digits.group(), exchange
+    return digits.group(), None
+
+
+def _infer_exchange(code: str) -> str:
+    """
+    推断数字编码所属交易所，先查证券主表登记的交易所，再按前缀推断
+    """
+    exchange = _SYMBOL_EXCHANGES.get(code)
+    if exchange:
+        return exchange
+    return next((market for prefix, market in _EXCHANGE_PREFIXES if code.startswith(prefix)), "SZ")
+
+
+@lru_cache(maxsize=1 << 16)
+def _fmt_symbol(symbol: str, style: str) -> str:
+    """
+    格式化单个标的代码，style 需为 `_symbol_style` 格式化后的风格，按标的缓存结果
+    """
+    code, exchange = _parse_symbol(symbol)
+    return _SYMBOL_FORMATS[style][exchange or _infer_exchange(code)].format(code)
+
+
+def fmt_symbols(
+    symbols: Union[str, List[str], Tuple[str]],
+    style: str=None
+) -> Union[str, List[str]]:
+    """
+    根据输入的股票或股票列表，和相应需要格式化的风格，实现标的代码的格式化
+    注意：
+        1. 如果输入的是单个标的，即 str 格式，返回的是 str，其他情况返回格式化标的列表
+        2. 支持沪深北交所，标的代码中带有交易所标识 (如 "SH"、"SZSE"、"XSHE"、"BJ") 时以标识为准，
+           否则使用证券主表登记的交易所 (见 `set_symbol_exchanges`)，没有登记时根据数字编码推断交易所
+        3. 大批量标的 (pandas Series/numpy 数组) 请使用 `convert_symbols`
+
+    Args:
+        symbols: 标的代码或标的代码列表
+        style: 标的编码风格，默认为 None，即只输出标的数字编号，支持 
+            - 'gm' 或 'goldminer'(掘金), 
+            - 'ts' 或 'tushare' (tushare)
+            - 'jq' 或 'joinquant' (聚宽), 
+            - 'wd' 或 'wind' (万得)
+
+    Returns:
+        格式化后的标的代码或标的列表
+    """
+    style = _symbol_style(style)
+    if isinstance(symbols, str):
+        return _fmt_symbol(symbols, style)
+    return [_fmt_symbol(symbol, style) for symbol in symbols]
+
+
+def convert_symbols(
+    symbols: Union[pd.Series, np.ndarray, List[str], Tuple[str]],
+    style: str=None
+) -> Union[pd.Series, np.ndarray, List[str]]:
+    """
+    `fmt_symbols` 的向量化版本，适用于行情、逐笔等大批量标的列
+        - 先对输入去重，每个不同的标的只解析一次，再按位置还原
+        - 输入为 category 类型的 Series 时只转换类别，输出同样为 category 类型
+        - 缺失值 (None/NaN) 原样输出为 None
+
+    Args:
+        symbols: 标的代码序列，支持 pandas Series、numpy 字符串数组、列表
+        style: 标的编码风格，与 `fmt_symbols` 一致
+
+    Returns:
+        与输入相同容器类型的格式化标的代码
+    """
+    import pandas as pd
+
+    style = _symbol_style(style)
+    if isinstance(symbols, pd.Series) and isinstance(symbols.dtype, pd.CategoricalDtype):
+        # 不同类别可能格式化为同一标的，重新去重后映射类别编码
+        category_codes, categories = pd.factorize(np.array([_fmt_symbol(symbol, style) for symbol in symbols.cat.categories], dtype=object))
+        codes = symbols.cat.codes.to_numpy()
+        codes = np.where(codes >= 0, category_codes[codes], -1)
+        return pd.Series(pd.Categorical.from_codes(codes, categories=categories), index=symbols.index, name=symbols.name)
+    codes, uniques = pd.factorize(np.asarray(symbols, dtype=object) if isinstance(symbols, (list, tuple)) else symbols)
+    converted = np.array([_fmt_symbol(symbol, style) for symbol in np.asarray(uniques, dtype=object)] + [None], dtype=object)
+    values = converted[codes]
+    if isinstance(symbols, pd.Series):
+        return pd.Series(values, index=symbols.index, name=symbols.name)
+    elif isinstance(symbols, np.ndarray):
+        return values.astype(str) if symbols.dtype.kind == "U" else values
+    elif isinstance(symbols, tuple):
+        return tuple(values.tolist())
+    return values.tolist()
@@ -0,0 +1,1571 @@
+"""
+交易日历: 生成、存储、导入交易日历，以及交易日查询
+"""
+from __future__ import annotations
+
+import datetime
+import os
+import pickle
+import struct
+import threading
+import time
+import warnings
+from bisect import bisect_left, bisect_right
+from collections.abc import Sequence
+from concurrent.futures import Future
+from functools import cached_property
+from typing import TYPE_CHECKING, Union, List, Tuple, Iterable, Iterator, Dict, NamedTuple
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:
+    # Windows 等不支持 fcntl 的平台只有进程内写锁
+    fcntl = None
+
+from .dates import _EPOCH_ORDINAL, DAY_OUTPUTS, to_day, from_day, _to_str, _from_day_list, _to_days_array, _from_days_array
+from .providers import CalendarProvider, get_calendar_provider
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# 二进制交易日历文件格式: 文件头 + 小端 int32 天数序号数组
+#   - 版本 1: 16 字节文件头 (魔数、版本号、交易日数目)，单个交易日历
+#   - 版本 2: 24 字节文件头 (魔数、版本号、交易日数目、覆盖区间起始日、覆盖区间截止日)，单个交易日历
+#   - 版本 3: 16 字节文件头 (魔数、版本号、交易日历数目) + 每个交易日历 32 字节的目录项
+#     (交易所、数组偏移、交易日数目、覆盖区间起始日、覆盖区间截止日)，按交易所保存多个交易日历
+_CAL_MAGIC = b"HCHYTCAL"
+_CAL_VERSION = 3
+_CAL_HEADERS = {
+    1: struct.Struct("<8sII"),
+    2: struct.Struct("<8sIIii"),
+    3: struct.Struct("<8sII"),
+}
+_CAL_SECTION = struct.Struct("<16sIIii")
+
+# 默认交易所 (与 tushare 默认一致)，以及所有交易所交易日历的并集/交集
+_DEFAULT_EXCHANGE = "SSE"
+_UNION = "UNION"
+_INTERSECTION = "INTERSECTION"
+
+# 交易日历支持的周期，以及月、季、年周期包含的月数
+_PERIODS = ("week", "month", "quarter", "year")
+_PERIOD_MONTHS = {"month": 1, "quarter": 3, "year": 12}
+
+# 覆盖区间端点即为首末交易日时 (如由交易日列表构造、旧版 pickle 转换、文件数据源)，端点外的自然日是否交易未知，
+# 周期边界与端点相差不超过该自然日数时 (周末、元旦等短期休市) 视为已覆盖
+_COVERAGE_SLACK = 7
+
+# 区间端点的包含方式，与 pandas 一致
+_INCLUSIVE = ("both", "left", "right", "neither")
+
+
+def _config_path(filename: str) -> str:
+    """
+    用户主目录下 ".config" 中的文件地址
+    """
+    return os.path.expanduser("~") + os.sep + ".config" + os.sep + filename
+
+
+def _normalize_exchange(exchange: str=None) -> str:
+    """
+    交易所代码格式化，默认为上交所
+    """
+    return (exchange or _DEFAULT_EXCHANGE).upper()
+
+def gen_trade_calendar(
+    start_date: Union[str, pd.Timestamp, datetime.date]=None, 
+    end_date: Union[str, pd.Timestamp, datetime.date] = None,
+    output: str=None,
+    local_config: str=None,
+    incremental: bool=False,
+    retries: int=3,
+    retry_wait: float=1,
+    exchange: str=None,
+    provider: CalendarProvider=None,
+    securities: Union[bool, str]=False) -> None:
+    """
+    生成交易日期的二进制文件 (格式见 `load_calendar`), 
+    1. 从 provider 查询交易日历，没有指定时使用 `set_calendar_provider` 设置的默认数据源，
+       没有设置默认数据源时使用 local_config 中的 tushare 账户信息
+    2. 入参没有指定 local_config, 会在用户主目录下的 ".config" 寻找 user_info.toml 文件
+    3. 配置文件格式需要为 toml 格式，填入 tushare 的 token 信息，格式如下：
+    ```
+    [tushare]
+    token = xxx
+    ```
+    4. 增量模式下读取本地已有的交易日历，只查询 [start_date, end_date] 中本地未覆盖的首尾区间，
+       本地已完全覆盖时不访问网络
+    5. 交易日历先写入临时文件再整体替换，并在文件头记录覆盖区间，读取方不会读到写了一半的文件
+    6. 同一文件按交易所保存多个交易日历，写入某个交易所时保留其他交易所的交易日历，
+       并重新计算所有交易所交易日历的并集 ("UNION") 及交集 ("INTERSECTION")，
+       并集及交集只覆盖所有交易所共同覆盖的区间，共同区间远小于单个交易所的覆盖区间时发出警告
+
+    Args:
+        start_date: 起始时间，默认从 "1990-01-01" 开始进行查询
+        end_date: 结束时间，默认为当前所属年份 12-31
+        output: 交易日历本地文件保存地址，没有指定时，
+            - 如果 end_date 指定时，会保存为 "~/.config/trade_cal_{start_date}_{end_date}.bin",
+            - 如果 end_date 为 None 时，会保存为 "~/.config/trade_cal.bin"
+        local_config: 本地 tushare 账户配置信息，没有指定，默认寻找 "~/.config/user_info.toml"
+        incremental: 是否增量更新本地交易日历，默认为 False，即全量查询并覆盖
+        retries: 查询失败或返回为空时的重试次数
+        retry_wait: 首次重试前等待的秒数，之后每次重试等待时间加倍，最多 60 秒
+        exchange: 交易所代码，默认为 "SSE"，支持 tushare 的 "SSE"、"SZSE"、"BSE" 等，以及港交所 "HKEX"
+        provider: 交易日历数据源
+        securities: 是否同时生成证券主表 (见 `gen_securities`)，True 时从同一数据源查询，
+            为字符串时读取该本地证券列表 CSV 文件，证券主表保存为交易日历文件所在目录下的 "securities.npz"
+    Returns:
+        None 
+    """
+    # 1. 设置查询区间及输出文件
+    default_range = (not start_date) and (not end_date)
+    start_date = "19900101" if not start_date else _to_str(to_day(start_date)).replace("-", "")
+    end_date = str(datetime.date.today().year) + "1231" if not end_date else _to_str(to_day(end_date)).replace("-", "")
+    if not output:
+        if default_range:
+            output = _config_path("trade_cal.bin")
+        else:
+            output = _config_path(f"trade_cal_{start_date}_{end_date}.bin")
+
+    # 2. 确定数据源，数据源有覆盖区间时只查询覆盖区间
+    exchange = _normalize_exchange(exchange)
+    if exchange in (_UNION, _INTERSECTION):
+        raise ValueError(f"[ERROR]\t{exchange} 交易日历由其他交易所交易日历计算得到，不能直接查询")
+    start_day, end_day = to_day(start_date), to_day(end_date)
+    if provider is None:
+        provider = get_calendar_provider(local_config)
+    if securities:
+        from .securities import gen_securities
+
+        gen_securities(
+            output=os.path.join(os.path.dirname(os.path.abspath(output)), "securities.npz"),
+            source=securities if isinstance(securities, str) else None,
+            retries=retries,
+            retry_wait=retry_wait,
+            provider=provider)
+    coverage = provider.coverage(exchange)
+    if coverage:
+        start_day, end_day = max(start_day, coverage[0]), min(end_day, coverage[1])
+        if start_day > end_day:
+            raise ValueError(f"[ERROR]\t交易日历数据源没有覆盖 {exchange} 交易日期 [{start_date}, {end_date}]")
+
+    with _store_lock(output):
+        # 3. 读取本地交易日历，增量模式下确定需要查询的区间
+        days = np.empty(0, dtype=np.int32)
+        fetch_ranges = [(start_day, end_day)]
+        calendars = _read_cal_store(output) if os.path.exists(output) else dict()
+        if incremental and exchange in calendars:
+            local_cal = calendars[exchange]
+            days = local_cal.days
+            fetch_ranges = []
+            if start_day < local_cal.valid_from:
+                fetch_ranges.append((start_day, local_cal.valid_from - 1))
+            if end_day > local_cal.valid_through:
+                fetch_ranges.append((local_cal.valid_through + 1, end_day))
+            if not fetch_ranges:
+                return
+            start_day = min(start_day, local_cal.valid_from)
+            end_day = max(end_day, local_cal.valid_through)
+
+        # 4. 查询缺失区间的交易日历，与本地交易日历合并后以二进制格式保存到本地
+        for fetch_start, fetch_end in fetch_ranges:
+            days = np.union1d(days, provider.fetch(exchange, fetch_start, fetch_end, retries, retry_wait))
+        if days.size == 0:
+            raise ValueError(f"[ERROR]\t查询 {exchange} 交易日期 [{start_date}, {end_date}]，没有交易日")
+
+        calendars[exchange] = TradingCalendar(days, start_day, end_day)
+        _dump_cal_store(calendars, output)
+    calendar_cache.invalidate()
+
+
+_STORE_LOCKS = dict()
+_STORE_LOCKS_LOCK = threading.Lock()
+
+
+class _StoreLock:
+    """
+    本地文件的写锁，同一文件的读取-合并-写入串行执行
+        - 进程内为可重入锁，同一线程可以嵌套加锁
+        - 进程间为旁路锁文件 ("{文件}.lock") 上的 fcntl 排他锁，多个进程同时写入不同交易所时不会互相覆盖，
+          锁文件无法创建 (如目录只读) 或平台不支持 fcntl 时只有进程内写锁
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.RLock()
+        self._depth = 0
+        self._file = None
+
+    def __enter__(self) -> "_StoreLock":
+        self._lock.acquire()
+        if self._depth == 0 and fcntl is not None:
+            try:
+                self._file = open(f"{self.path}.lock", "a")
+            except OSError:
+                self._file = None
+            else:
+                try:
+                    fcntl.flock(self._file.fileno(), fcntl.LOCK_EX)
+                except BaseException:
+                    self._file.close()
+                    self._file = None
+                    self._lock.release()
+                    raise
+        self._depth += 1
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._depth -= 1
+        if self._depth == 0 and self._file is not None:
+            try:
+                fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+            finally:
+                self._file.close()
+                self._file = None
+        self._lock.release()
+
+
+def _store_lock(path: str) -> _StoreLock:
+    """
+    本地文件的写锁 (进程内及进程间)，见 `_StoreLock`
+    """
+    path = os.path.abspath(path)
+    with _STORE_LOCKS_LOCK:
+        if path not in _STORE_LOCKS:
+            _STORE_LOCKS[path] = _StoreLock(path)
+        return _STORE_LOCKS[path]
+
+
+def load_trade_cal(local_cal: str=None, exchange: str=None) -> List[str]:
+    """
+    导入交易日历，本地日历文件不存在则进行网络全量获取
+
+    Args:
+        local_cal: 本地日历文件，默认为 ~/.config/trade_cal.bin
+        exchange: 交易所代码，默认为 "SSE"，"UNION"/"INTERSECTION" 为所有交易所交易日历在共同覆盖区间上的并集/交集
+
+    Returns:
+        List[str]: "YYYY-mm-dd" 格式的交易日列表
+    """
+    return load_calendar(local_cal, exchange)._date_list
+
+
+def _check_period(period: str) -> None:
+    if period not in _PERIODS:
+        raise ValueError(f"[ERROR]\t不支持的周期 {period}，只支持 {_PERIODS}")
+
+
+def _period_key(day: int, period: str) -> int:
+    """
+    天数序号所在周期的编号: 周以周一为起点 (1970-01-01 为周四)，月、季、年为自 1970 年起的月数除以周期月数
+    """
+    if period == "week":
+        return (day + 3) // 7
+    date = datetime.date.fromordinal(day + _EPOCH_ORDINAL)
+    return ((date.year - 1970) * 12 + date.month - 1) // _PERIOD_MONTHS[period]
+
+
+def _period_keys(days: np.ndarray, period: str) -> np.ndarray:
+    """
+    `_period_key` 的向量化版本
+    """
+    if period == "week":
+        return (days + 3) // 7
+    months = days.astype("datetime64[D]").astype("datetime64[M]").astype(np.int64)
+    return months // _PERIOD_MONTHS[period]
+
+
+def _period_spans(keys: np.ndarray, period: str) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    周期编号对应的自然日区间 (起始日, 截止日)，均为天数序号
+    """
+    if period == "week":
+        start = keys * 7 - 3
+        return start, start + 6
+    months = keys * _PERIOD_MONTHS[period]
+    start = months.astype("datetime64[M]").astype("datetime64[D]").astype(np.int64)
+    end = (months + _PERIOD_MONTHS[period]).astype("datetime64[M]").astype("datetime64[D]").astype(np.int64) - 1
+    return start, end
+
+
+class _PeriodTable(NamedTuple):
+    """
+    交易日历按周期划分的边界表
+        - keys/starts/ends: 每个周期的编号、第一个及最后一个交易日下标
+        - head_covered/tail_covered: 周期的第一个/最后一个自然日是否在覆盖区间内，
+          正数序号只要求周期开始已覆盖，负数序号只要求周期结束已覆盖
+        - groups/ordinals: 每个交易日所在周期的序号 (keys 中的下标)，以及在周期内是第几个交易日 (从 0 开始)
+        - lookup: 周期编号 -> 周期序号
+    """
+    keys: np.ndarray
+    starts: np.ndarray
+    ends: np.ndarray
+    head_covered: np.ndarray
+    tail_covered: np.ndarray
+    groups: np.ndarray
+    ordinals: np.ndarray
+    lookup: Dict[int, int]
+
+
+class TradingCalendar:
+    """
+    基于有序数组的交易日历
+        - 交易日以自 1970-01-01 起的天数序号存储为 int32 有序数组
+        - 成员判断通过位置索引 (天数序号 -> 数组下标) 完成，为 O(1)
+        - 吸附 (snap)、偏移 (shift)、区间 (range) 查询均为二分查找，为 O(log n)
+        - 周、月、季、年的边界表在首次按周期查询时计算，之后周期内序号、首末交易日查询均为 O(1)
+
+    Args:
+        days: 交易日天数序号数组，需有序且不重复，一般通过 `TradingCalendar.from_dates` 构造
+        valid_from: 交易日历覆盖区间的起始日 (天数序号)，默认为第一个交易日
+        valid_through: 交易日历覆盖区间的截止日 (天数序号)，默认为最后一个交易日
+    """
+
+    def __init__(self, days: Union[np.ndarray, List[int]], valid_from: int=None, valid_through: int=None):
+        self.days = np.asarray(days, dtype=np.int32)
+        if self.days.ndim != 1 or self.days.size == 0:
+            raise ValueError("[ERROR]\t交易日历不能为空")
+        self.valid_from = int(self.days[0]) if valid_from is None else int(valid_from)
+        self.valid_through = int(self.days[-1]) if valid_through is None else int(valid_through)
+
+    @cached_property
+    def _day_list(self) -> List[int]:
+        # 标量查询使用 bisect，首次标量查询时才构造，只做批量查询的进程不占用额外内存
+        return self.days.tolist()
+
+    @cached_property
+    def _positions(self) -> dict:
+        return {day: pos for pos, day in enumerate(self._day_list)}
+
+    @cached_property
+    def _date_list(self) -> List[str]:
+        return [_to_str(day) for day in self._day_list]
+
+    @cached_property
+    def _period_tables(self) -> Dict[str, _PeriodTable]:
+        return dict()
+
+    @classmethod
+    def from_dates(cls, trade_dates: Iterable[Union[str, datetime.date, pd.Timestamp]]) -> "TradingCalendar":
+        """
+        由交易日列表构造交易日历，兼容 `load_trade_cal` 返回的 "YYYY-mm-dd" 字符串列表及 Timestamp 列表
+
+        Args:
+            trade_dates: 交易日列表
+        """
+        import pandas as pd
+
+        days = pd.to_datetime(list(trade_dates)).values.astype("datetime64[D]").astype(np.int64)
+        return cls(np.unique(days))
+
+    def __len__(self) -> int:
+        return len(self.days)
+
+    def __contains__(self, cursor_date: Union[str, datetime.date, pd.Timestamp]) -> bool:
+        return to_day(cursor_date) in self._positions
+
+    @property
+    def first(self) -> str:
+        """
+        交易日历的第一个交易日
+        """
+        return _to_str(self._day_list[0])
+
+    @property
+    def last(self) -> str:
+        """
+        交易日历的最后一个交易日
+        """
+        return _to_str(self._day_list[-1])
+
+    def is_stale(self, cursor_date: Union[str, datetime.date, pd.Timestamp]=None) -> bool:
+        """
+        判断交易日历是否已过期，即指定日期超出交易日历覆盖区间的截止日
+
+        Args:
+            cursor_date: 指定日期，默认为当前日期
+        """
+        if not cursor_date:
+            cursor_date = datetime.date.today()
+        return to_day(cursor_date) > self.valid_through
+
+    def index(self, cursor_date: Union[str, datetime.date, pd.Timestamp]) -> int:
+        """
+        查询交易日在交易日历中的位置
+
+        Args:
+            cursor_date: 指定交易日
+
+        Returns:
+            int: 交易日所在下标
+        """
+        day = to_day(cursor_date)
+        if day not in self._positions:
+            raise ValueError(f"[ERROR]\t日期 {_to_str(day)} 不是交易日")
+        return self._positions[day]
+
+    def _snap_pos(self, day: int, direction: int) -> int:
+        """
+        返回 day 按 direction 吸附到的交易日下标
+        """
+        pos = self._positions.get(day)
+        if pos is not None:
+            return pos
+        if (day < self._day_list[0]) or (day > self._day_list[-1]):
+            raise ValueError(f"[ERROR]\t交易日期 {_to_str(day)} 小于交易日历最小值 {self.first} 或大于交易日历最大值 {self.last}")
+        if direction == -1:
+            return bisect_left(self._day_list, day) - 1
+        elif direction == 1:
+            return bisect_left(self._day_list, day)
+        raise ValueError(f"[ERROR]\t不支持的查询方向 {direction}，只支持 -1 或 1")
+
+    def _shift_pos(self, day: int, n: int, inclusive: bool) -> int:
+        """
+        返回 day 偏移 n 个交易日后的下标，n 为正往未来偏移，n 为负往历史回溯
+        - day 为交易日且 inclusive 为 False 时，day 本身不计入偏移步数
+        - 其余情况下，day 吸附到的交易日即为偏移的第一步
+        """
+        step = 1 if n > 0 else -1
+        pos = self._positions.get(day)
+        if pos is not None and not inclusive:
+            target = pos + n
+        else:
+            if pos is None:
+                pos = self._snap_pos(day, step)
+            target = pos + n - step
+        if target < 0 or target >= len(self._day_list):
+            raise ValueError(f"[ERROR]\t日期 {_to_str(day)} 偏移 {n} 个交易日后超出交易日历范围 [{self.first}, {self.last}]")
+        return target
+
+    def is_trade_date(self, cursor_date: Union[str, datetime.date, pd.Timestamp]) -> bool:
+        """
+        判断指定日期是否为交易日
+        """
+        return cursor_date in self
+
+    def snap(self, cursor_date: Union[str, int, datetime.date, pd.Timestamp], direction: int=-1, output: str="str") -> Union[str, int, datetime.date]:
+        """
+        将指定日期吸附到交易日，如果指定日期为交易日则返回指定日期，否则按指定方向查询最近的交易日
+
+        Args:
+            cursor_date: 指定日期
+            direction: 查询方向，-1 往历史回溯，1 往未来推演
+            output: 输出类型，"str" 为 "YYYY-mm-dd" 格式，"date" 为 datetime.date，"day" 为天数序号
+
+        Returns:
+            交易日
+        """
+        return from_day(self._day_list[self._snap_pos(to_day(cursor_date), direction)], output)
+
+    def shift(self, cursor_date: Union[str, int, datetime.date, pd.Timestamp], n: int, inclusive: bool=False, output: str="str") -> Union[str, int, datetime.date]:
+        """
+        将指定日期偏移 n 个交易日，语义与 `get_pre_trade_date`/`get_next_trade_date` 一致
+
+        Args:
+            cursor_date: 指定日期
+            n: 偏移的交易日数目，正数往未来推演，负数往历史回溯，不能为 0
+            inclusive: 当 cursor_date 为交易日的时候，是否包含 cursor_date
+            output: 输出类型，"str" 为 "YYYY-mm-dd" 格式，"date" 为 datetime.date，"day" 为天数序号
+
+        Returns:
+            交易日
+        """
+        if n == 0:
+            raise ValueError("[ERROR]\t偏移的交易日数目不能为 0")
+        return from_day(self._day_list[self._shift_pos(to_day(cursor_date), n, inclusive)], output)
+
+    def range(self, start_date: Union[str, int, datetime.date, pd.Timestamp], end_date: Union[str, int, datetime.date, pd.Timestamp], output: str="str") -> List[Union[str, int, datetime.date]]:
+        """
+        获取 [start_date, end_date] 闭区间内的交易日
+
+        Args:
+            start_date: 开始日期
+            end_date: 结束日期
+            output: 输出类型，"str" 为 "YYYY-mm-dd" 格式，"date" 为 datetime.date，"day" 为天数序号
+
+        Returns:
+            List: 交易日列表
+        """
+        lo = bisect_left(self._day_list, to_day(start_date))
+        hi = bisect_right(self._day_list, to_day(end_date))
+        if output == "str":
+            return self._date_list[lo:hi]
+        return _from_day_list(self._day_list[lo:hi], output)
+
+    def _check_range(self, days: np.ndarray, invalid: np.ndarray, message: str) -> None:
+        """
+        批量查询的越界检查，出现越界时以第一个越界日期报错
+        """
+        if invalid.any():
+            day = int(days[np.argmax(invalid)])
+            raise ValueError(f"[ERROR]\t交易日期 {_to_str(day)} {message} [{self.first}, {self.last}]")
+
+    def _locate(self, days: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        批量二分查找，返回 (插入位置, 是否为交易日)
+        """
+        pos = np.searchsorted(self.days, days, side="left")
+        member = self.days[np.minimum(pos, len(self.days) - 1)] == days
+        return pos, member
+
+    def contains_days(self, days: np.ndarray) -> np.ndarray:
+        """
+        `is_trade_date` 的向量化版本，输入为天数序号数组，返回是否为交易日的布尔数组
+        """
+        return self._locate(np.asarray(days, dtype=np.int64))[1]
+
+    def snap_days(self, days: np.ndarray, direction: int=-1, mask: np.ndarray=None) -> np.ndarray:
+        """
+        `snap` 的向量化版本，输入输出均为天数序号数组
+
+        Args:
+            days: 天数序号数组
+            direction: 查询方向，-1 往历史回溯，1 往未来推演
+            mask: 需要跳过的元素 (如 NaT)，对应位置的输出无意义
+
+        Returns:
+            np.ndarray: 吸附后的交易日天数序号
+        """
+        if direction not in (-1, 1):
+            raise ValueError(f"[ERROR]\t不支持的查询方向 {direction}，只支持 -1 或 1")
+        days = np.asarray(days, dtype=np.int64)
+        valid = np.ones(days.shape, dtype=bool) if mask is None else ~mask
+        pos, member = self._locate(days)
+        outside = (days < self.days[0]) | (days > self.days[-1])
+        self._check_range(days, valid & outside & ~member, "小于交易日历最小值或大于交易日历最大值")
+        if direction == -1:
+            pos = np.where(member, pos, pos - 1)
+        pos = np.clip(pos, 0, len(self.days) - 1)
+        return self.days[pos].astype(np.int64)
+
+    def shift_days(self, days: np.ndarray, n: int, inclusive: bool=False, mask: np.ndarray=None) -> np.ndarray:
+        """
+        `shift` 的向量化版本，输入输出均为天数序号数组
+
+        Args:
+            days: 天数序号数组
+            n: 偏移的交易日数目，正数往未来推演，负数往历史回溯，不能为 0
+            inclusive: 当日期为交易日的时候，是否包含该日期
+            mask: 需要跳过的元素 (如 NaT)，对应位置的输出无意义
+
+        Returns:
+            np.ndarray: 偏移后的交易日天数序号
+        """
+        if n == 0:
+            raise ValueError("[ERROR]\t偏移的交易日数目不能为 0")
+        step = 1 if n > 0 else -1
+        days = np.asarray(days, dtype=np.int64)
+        valid = np.ones(days.shape, dtype=bool) if mask is None else ~mask
+        pos, member = self._locate(days)
+        outside = (days < self.days[0]) | (days > self.days[-1])
+        self._check_range(days, valid & outside & ~member, "小于交易日历最小值或大于交易日历最大值")
+        # 非交易日先按偏移方向吸附，吸附到的交易日计为偏移的第一步
+        snapped = pos - 1 if step == -1 else pos
+        if inclusive:
+            target = np.where(member, pos, snapped) + n - step
+        else:
+            target = np.where(member, pos + n, snapped + n - step)
+        self._check_range(days, valid & ((target < 0) | (target >= len(self.days))), f"偏移 {n} 个交易日后超出交易日历范围")
+        target = np.clip(target, 0, len(self.days) - 1)
+        return self.days[target].astype(np.int64)
+
+    def count(self, start_date: Union[str, int, datetime.date, pd.Timestamp], end_date: Union[str, int, datetime.date, pd.Timestamp]) -> int:
+        """
+        [start_date, end_date] 闭区间内的交易日数目，不构造交易日列表
+
+        Args:
+            start_date: 开始日期
+            end_date: 结束日期
+
+        Returns:
+            int: 交易日数目，start_date 晚于 end_date 时为 0
+        """
+        lo = bisect_left(self._day_list, to_day(start_date))
+        hi = bisect_right(self._day_list, to_day(end_date))
+        return max(hi - lo, 0)
+
+    def count_days(self, start_days: np.ndarray, end_days: np.ndarray) -> np.ndarray:
+        """
+        `count` 的向量化版本，输入为天数序号数组
+        """
+        lo = np.searchsorted(self.days, np.asarray(start_days, dtype=np.int64), side="left")
+        hi = np.searchsorted(self.days, np.asarray(end_days, dtype=np.int64), side="right")
+        return np.maximum(hi - lo, 0)
+
+    def view(
+        self,
+        start_date: Union[str, int, datetime.date, pd.Timestamp],
+        end_date: Union[str, int, datetime.date, pd.Timestamp],
+        inclusive: str="both",
+        output: str="str") -> TradeDateRange:
+        """
+        获取 start_date 与 end_date 之间交易日的视图，不复制交易日
+
+        Args:
+            start_date: 开始日期
+            end_date: 结束日期
+            inclusive: 端点为交易日时是否包含，"both" (默认) 包含两端，"left"/"right" 只包含开始/结束日期，"neither" 都不包含
+            output: 元素类型，"str" 为 "YYYY-mm-dd" 格式，"date" 为 datetime.date，"day" 为天数序号
+
+        Returns:
+            TradeDateRange: 交易日区间视图
+        """
+        if inclusive not in _INCLUSIVE:
+            raise ValueError(f"[ERROR]\t不支持的包含方式 {inclusive}，只支持 {_INCLUSIVE}")
+        start_day, end_day = to_day(start_date), to_day(end_date)
+        lo = bisect_left(self._day_list, start_day) if inclusive in ("both", "left") else bisect_right(self._day_list, start_day)
+        hi = bisect_right(self._day_list, end_day) if inclusive in ("both", "right") else bisect_left(self._day_list, end_day)
+        return TradeDateRange(self, range(lo, max(lo, hi)), output)
+
+    def windows(
+        self,
+        start_date: Union[str, int, datetime.date, pd.Timestamp],
+        end_date: Union[str, int, datetime.date, pd.Timestamp],
+        size: int,
+        step: int=1,
+        expanding: bool=False,
+        inclusive: str="both",
+        output: str="str") -> Iterator[TradeDateRange]:
+        """
+        逐个生成区间内的滚动或扩展窗口，每个窗口为交易日区间视图
+            - 滚动窗口: 每个窗口包含 size 个交易日，窗口结束日每次后移 step 个交易日
+            - 扩展窗口: 每个窗口从区间第一个交易日开始，第一个窗口包含 size 个交易日，之后每次增加 step 个交易日
+
+        Args:
+            start_date: 开始日期
+            end_date: 结束日期
+            size: 滚动窗口长度，扩展窗口的最小长度
+            step: 相邻窗口结束日之间的交易日数目
+            expanding: 是否为扩展窗口
+            inclusive: 区间端点的包含方式，见 `view`
+            output: 元素类型
+
+        Returns:
+            Iterator[TradeDateRange]: 窗口生成器
+        """
+        if size <= 0 or step <= 0:
+            raise ValueError(f"[ERROR]\t窗口长度 {size} 及步长 {step} 必须为正数")
+        positions = self.view(start_date, end_date, inclusive).positions
+        for stop in range(positions.start + size, positions.stop + 1, step):
+            yield TradeDateRange(self, range(positions.start if expanding else stop - size, stop), output)
+
+    def _period_table(self, period: str) -> _PeriodTable:
+        """
+        计算并缓存指定周期的边界表
+        """
+        table = self._period_tables.get(period)
+        if table is not None:
+            return table
+        _check_period(period)
+        keys = _period_keys(self.days.astype(np.int64), period)
+        starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+        ends = np.r_[starts[1:] - 1, len(keys) - 1]
+        span_start, span_end = _period_spans(keys[starts], period)
+        groups = np.repeat(np.arange(len(starts)), ends - starts + 1)
+        valid_from = self.valid_from - (_COVERAGE_SLACK if self.valid_from == int(self.days[0]) else 0)
+        valid_through = self.valid_through + (_COVERAGE_SLACK if self.valid_through == int(self.days[-1]) else 0)
+        table = _PeriodTable(
+            keys=keys[starts],
+            starts=starts,
+            ends=ends,
+            head_covered=span_start >= valid_from,
+            tail_covered=span_end <= valid_through,
+            groups=groups,
+            ordinals=np.arange(len(keys)) - starts[groups],
+            lookup={key: group for group, key in enumerate(keys[starts].tolist())},
+        )
+        self._period_tables[period] = table
+        return table
+
+    def period_index(self, cursor_date: Union[str, int, datetime.date, pd.Timestamp], period: str="month") -> int:
+        """
+        查询交易日是所在周期的第几个交易日 (从 0 开始)
+
+        Args:
+            cursor_date: 指定交易日
+            period: 周期，"week"/"month"/"quarter"/"year"
+
+        Returns:
+            int: 周期内序号
+        """
+        return int(self._period_table(period).ordinals[self.index(cursor_date)])
+
+    def period_nth(self, cursor_date: Union[str, int, datetime.date, pd.Timestamp], period: str="month", n: int=0, output: str="str") -> Union[str, int, datetime.date]:
+        """
+        查询指定日期所在周期的第 n 个交易日，n 为 0 时为周期第一个交易日，为 -1 时为周期最后一个交易日
+
+        Args:
+            cursor_date: 指定日期，可以为非交易日
+            period: 周期，"week"/"month"/"quarter"/"year"
+            n: 周期内序号，非负数从周期第一个交易日起计数，负数从周期最后一个交易日起倒数
+            output: 输出类型，"str" 为 "YYYY-mm-dd" 格式，"date" 为 datetime.date，"day" 为天数序号
+
+        Returns:
+            交易日
+        """
+        table = self._period_table(period)
+        day = to_day(cursor_date)
+        group = table.lookup.get(_period_key(day, period))
+        if group is None or not (table.head_covered if n >= 0 else table.tail_covered)[group]:
+            raise ValueError(f"[ERROR]\t日期 {_to_str(day)} 所在的 {period} 周期不在交易日历覆盖区间 [{_to_str(self.valid_from)}, {_to_str(self.valid_through)}] 内或没有交易日")
+        pos = table.starts[group] + n if n >= 0 else table.ends[group] + n + 1
+        if pos < table.starts[group] or pos > table.ends[group]:
+            raise ValueError(f"[ERROR]\t日期 {_to_str(day)} 所在的 {period} 周期只有 {table.ends[group] - table.starts[group] + 1} 个交易日")
+        return from_day(self._day_list[pos], output)
+
+    def period_index_days(self, days: np.ndarray, period: str="month") -> np.ndarray:
+        """
+        `period_index` 的向量化版本，输入为天数序号数组，非交易日对应 -1
+        """
+        days = np.asarray(days, dtype=np.int64)
+        pos, member = self._locate(days)
+        ordinals = self._period_table(period).ordinals[np.minimum(pos, len(self.days) - 1)]
+        return np.where(member, ordinals, -1)
+
+    def period_nth_days(self, days: np.ndarray, period: str="month", n: int=0, mask: np.ndarray=None) -> np.ndarray:
+        """
+        `period_nth` 的向量化版本，输入输出均为天数序号数组
+
+        Args:
+            days: 天数序号数组
+            period: 周期，"week"/"month"/"quarter"/"year"
+            n: 周期内序号，非负数从周期第一个交易日起计数，负数从周期最后一个交易日起倒数
+            mask: 需要跳过的元素 (如 NaT)，对应位置的输出无意义
+
+        Returns:
+            np.ndarray: 交易日天数序号
+        """
+        table = self._period_table(period)
+        days = np.asarray(days, dtype=np.int64)
+        valid = np.ones(days.shape, dtype=bool) if mask is None else ~mask
+        keys = _period_keys(days, period)
+        groups = np.clip(np.searchsorted(table.keys, keys), 0, len(table.keys) - 1)
+        found = (table.keys[groups] == keys) & (table.head_covered if n >= 0 else table.tail_covered)[groups]
+        self._check_range(days, valid & ~found, f"所在的 {period} 周期不在交易日历覆盖区间内或没有交易日，交易日历范围为")
+        pos = table.starts[groups] + n if n >= 0 else table.ends[groups] + n + 1
+        self._check_range(days, valid & ((pos < table.starts[groups]) | (pos > table.ends[groups])), f"所在的 {period} 周期不足 {abs(n) + (n >= 0)} 个交易日，交易日历范围为")
+        return self.days[np.clip(pos, 0, len(self.days) - 1)].astype(np.int64)
+
+    def period_days(
+        self,
+        period: str="month",
+        n: int=-1,
+        start_date: Union[str, int, datetime.date, pd.Timestamp]=None,
+        end_date: Union[str, int, datetime.date, pd.Timestamp]=None,
+        output: str="str") -> List[Union[str, int, datetime.date]]:
+        """
+        每个周期的第 n 个交易日，如每月最后一个交易日 (n=-1)、每周第一个交易日 (n=0)、每季第 3 个交易日 (n=2)
+            - n 为非负数时只包含开始已在交易日历覆盖区间内的周期，n 为负数时只包含结束已在覆盖区间内的周期，
+              交易日不足 n 个的周期跳过
+
+        Args:
+            period: 周期，"week"/"month"/"quarter"/"year"
+            n: 周期内序号，非负数从周期第一个交易日起计数，负数从周期最后一个交易日起倒数
+            start_date: 开始日期，只返回不早于开始日期的交易日，默认不限
+            end_date: 结束日期，只返回不晚于结束日期的交易日，默认不限
+            output: 输出类型，"str" 为 "YYYY-mm-dd" 格式，"date" 为 datetime.date，"day" 为天数序号
+
+        Returns:
+            List: 交易日列表
+        """
+        table = self._period_table(period)
+        pos = table.starts + n if n >= 0 else table.ends + n + 1
+        pos = pos[(table.head_covered if n >= 0 else table.tail_covered) & (pos >= table.starts) & (pos <= table.ends)]
+        days = self.days[pos]
+        if start_date is not None:
+            days = days[days >= to_day(start_date)]
+        if end_date is not None:
+            days = days[days <= to_day(end_date)]
+        return _from_day_list(days.tolist(), output)
+
+
+class TradeDateRange(Sequence):
+    """
+    交易日区间视图，由交易日历及交易日下标区间构成，不复制交易日
+        - 支持 len、下标、切片 (返回新的视图)、迭代、in 判断，可与交易日列表直接比较
+        - days 为交易日历数组的 numpy 视图 (int32 天数序号)
+        - 元素类型由 output 决定: "str" 为 "YYYY-mm-dd" 格式，"date" 为 datetime.date，"day" 为天数序号
+
+    Args:
+        calendar: 交易日历
+        positions: 交易日下标区间
+        output: 元素类型
+    """
+
+    __slots__ = ("calendar", "positions", "output")
+
+    def __init__(self, calendar: TradingCalendar, positions: range, output: str="str"):
+        if output not in DAY_OUTPUTS:
+            raise ValueError(f"[ERROR]\t不支持的输出类型 {output}，只支持 {DAY_OUTPUTS}")
+        self.calendar = calendar
+        self.positions = positions
+        self.output = output
+
+    @property
+    def days(self) -> np.ndarray:
+        """
+        交易日天数序号数组，为交易日历数组的视图
+        """
+        positions = self.positions
+        if not positions:
+            return self.calendar.days[:0]
+        stop = positions[-1] + (1 if positions.step > 0 else -1)
+        return self.calendar.days[positions.start:stop if stop >= 0 else None:positions.step]
+
+    def __len__(self) -> int:
+        return len(self.positions)
+
+    def __getitem__(self, item: Union[int, slice]):
+        if isinstance(item, slice):
+            return TradeDateRange(self.calendar, self.positions[item], self.output)
+        pos = self.positions[item]
+        if self.output == "str":
+            return self.calendar._date_list[pos]
+        return from_day(self.calendar._day_list[pos], self.output)
+
+    def __iter__(self) -> Iterator[Union[str, int, datetime.date]]:
+        if self.output == "str":
+            return map(self.calendar._date_list.__getitem__, self.positions)
+        return (from_day(day, self.output) for day in map(self.calendar._day_list.__getitem__, self.positions))
+
+    def __contains__(self, cursor_date) -> bool:
+        pos = self.calendar._positions.get(to_day(cursor_date))
+        return pos is not None and pos in self.positions
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, TradeDateRange):
+            return np.array_equal(self.days, other.days)
+        if isinstance(other, (list, tuple)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        if not self.positions:
+            return "TradeDateRange([])"
+        return f"TradeDateRange([{self.first}, {self.last}], {len(self)} 个交易日)"
+
+    @property
+    def first(self) -> Union[str, int, datetime.date]:
+        return self[0]
+
+    @property
+    def last(self) -> Union[str, int, datetime.date]:
+        return self[-1]
+
+    def searchsorted(self, cursor_dates, side: str="left") -> Union[int, np.ndarray]:
+        """
+        查询日期在区间内的插入位置，与 `numpy.searchsorted` 一致
+
+        Args:
+            cursor_dates: 日期或日期序列
+            side: "left" 或 "right"
+
+        Returns:
+            插入位置，标量输入返回 int，其他输入返回 numpy 数组
+        """
+        if np.ndim(cursor_dates) == 0:
+            return int(np.searchsorted(self.days, to_day(cursor_dates), side=side))
+        days, _ = _to_days_array(cursor_dates)
+        return np.searchsorted(self.days, days, side=side)
+
+    def tolist(self, output: str=None) -> List[Union[str, int, datetime.date]]:
+        """
+        转换为交易日列表，output 默认为视图的元素类型
+        """
+        output = output or self.output
+        if output == "str":
+            return [self.calendar._date_list[pos] for pos in self.positions]
+        return _from_day_list(self.days.tolist(), output)
+
+    def to_numpy(self) -> np.ndarray:
+        """
+        转换为 datetime64[D] 数组
+        """
+        return self.days.astype("datetime64[D]")
+
+    def to_datetimeindex(self) -> pd.DatetimeIndex:
+        """
+        转换为 pandas DatetimeIndex
+        """
+        import pandas as pd
+
+        return pd.DatetimeIndex(self.days.astype("datetime64[D]").astype("datetime64[ns]"))
+
+
+def _dump_cal_store(calendars: Dict[str, TradingCalendar], output: str) -> None:
+    """
+    按交易所以二进制格式保存多个交易日历，并附带所有交易所交易日历的并集及交集，
+    先写入临时文件再替换，读取方不会读到写了一半的文件
+        - 并集及交集只在所有交易所共同覆盖的区间上计算，共同区间不到最长覆盖区间的一半 (或没有共同区间) 时发出警告
+    """
+    calendars = {_normalize_exchange(name): trade_cal for name, trade_cal in calendars.items() if name not in (_UNION, _INTERSECTION)}
+    if not calendars:
+        raise ValueError(f"[ERROR]\t交易日历为空，不写入 {output}")
+
+    # 1. 在所有交易所共同覆盖的区间上计算并集及交集
+    valid_from = max(trade_cal.valid_from for trade_cal in calendars.values())
+    valid_through = min(trade_cal.valid_through for trade_cal in calendars.values())
+    sections = dict(calendars)
+    widest = max(calendars, key=lambda name: calendars[name].valid_through - calendars[name].valid_from)
+    widest_span = calendars[widest].valid_through - calendars[widest].valid_from + 1
+    if valid_from > valid_through:
+        warnings.warn(f"[WARNING]\t{output} 中各交易所的交易日历没有共同覆盖的区间，不生成 {_UNION}/{_INTERSECTION}", stacklevel=2)
+    elif (valid_through - valid_from + 1) * 2 < widest_span:
+        warnings.warn(
+            f"[WARNING]\t{output} 中 {_UNION}/{_INTERSECTION} 只覆盖所有交易所共同覆盖的区间 "
+            f"[{from_day(valid_from)}, {from_day(valid_through)}]，远小于 {widest} 的覆盖区间 "
+            f"[{from_day(calendars[widest].valid_from)}, {from_day(calendars[widest].valid_through)}]",
+            stacklevel=2)
+    if valid_from <= valid_through:
+        clipped = [trade_cal.days[(trade_cal.days >= valid_from) & (trade_cal.days <= valid_through)] for trade_cal in calendars.values()]
+        for name, merge in ((_UNION, np.union1d), (_INTERSECTION, np.intersect1d)):
+            days = clipped[0]
+            for other in clipped[1:]:
+                days = merge(days, other)
+            if days.size:
+                sections[name] = TradingCalendar(days, valid_from, valid_through)
+
+    # 2. 写入文件头、目录项及各交易日历数组
+    header = _CAL_HEADERS[_CAL_VERSION]
+    offset = header.size + _CAL_SECTION.size * len(sections)
+    tmp_output = f"{output}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_output, "wb") as f:
+            f.write(header.pack(_CAL_MAGIC, _CAL_VERSION, len(sections)))
+            for name, trade_cal in sections.items():
+                f.write(_CAL_SECTION.pack(name.encode("ascii"), offset, len(trade_cal.days), trade_cal.valid_from, trade_cal.valid_through))
+                offset += trade_cal.days.size * 4
+            for trade_cal in sections.values():
+                f.write(np.ascontiguousarray(trade_cal.days, dtype="<i4").tobytes())
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_output, output)
+    finally:
+        if os.path.exists(tmp_output):
+            os.remove(tmp_output)
+
+
+def _is_cal_file(local_cal: str) -> bool:
+    """
+    根据文件头判断是否为二进制交易日历文件
+    """
+    with open(local_cal, "rb") as f:
+        return f.read(len(_CAL_MAGIC)) == _CAL_MAGIC
+
+
+def _read_cal_index(local_cal: str) -> Dict[str, Tuple[int, int, int, int]]:
+    """
+    只读取二进制交易日历文件的文件头及目录，返回 {交易所: (数组偏移, 交易日数目, 覆盖区间起始日, 覆盖区间截止日)}，
+    版本 1/2 的单个交易日历视为默认交易所的交易日历
+    """
+    with open(local_cal, "rb") as f:
+        header = f.read(max(header.size for header in _CAL_HEADERS.values()))
+        if len(header) < 12 or header[:len(_CAL_MAGIC)] != _CAL_MAGIC:
+            raise ValueError(f"[ERROR]\t交易日历文件 {local_cal} 格式错误")
+        version = struct.unpack_from("<I", header, len(_CAL_MAGIC))[0]
+        if version not in _CAL_HEADERS:
+            raise ValueError(f"[ERROR]\t交易日历文件 {local_cal} 版本 {version} 不受支持，当前支持的最高版本为 {_CAL_VERSION}")
+        header_struct = _CAL_HEADERS[version]
+        if len(header) < header_struct.size:
+            raise ValueError(f"[ERROR]\t交易日历文件 {local_cal} 格式错误")
+        fields = header_struct.unpack_from(header)
+        if version < 3:
+            valid_from, valid_through = fields[3:5] if version == 2 else (None, None)
+            return {_DEFAULT_EXCHANGE: (header_struct.size, fields[2], valid_from, valid_through)}
+        f.seek(header_struct.size)
+        directory = f.read(_CAL_SECTION.size * fields[2])
+    if len(directory) < _CAL_SECTION.size * fields[2]:
+        raise ValueError(f"[ERROR]\t交易日历文件 {local_cal} 格式错误")
+    index = dict()
+    for name, offset, count, valid_from, valid_through in _CAL_SECTION.iter_unpack(directory):
+        index[name.rstrip(b"\0").decode("ascii")] = (offset, count, valid_from, valid_through)
+    return index
+
+
+def _map_cal_section(local_cal: str, section: Tuple[int, int, int, int]) -> TradingCalendar:
+    """
+    以内存映射方式读取二进制交易日历文件中的一个交易日历，多个进程共享同一份页缓存
+    """
+    offset, count, valid_from, valid_through = section
+    if count == 0:
+        raise ValueError(f"[ERROR]\t交易日历文件 {local_cal} 为空")
+    days = np.memmap(local_cal, dtype="<i4", mode="r", offset=offset, shape=(count,))
+    return TradingCalendar(days, valid_from, valid_through)
+
+
+def _read_cal_store(local_cal: str) -> Dict[str, TradingCalendar]:
+    """
+    读取本地交易日历文件中所有交易所的交易日历，兼容二进制格式及旧版 pickle 格式
+    """
+    if not _is_cal_file(local_cal):
+        with open(local_cal, "rb") as f:
+            return {_DEFAULT_EXCHANGE: TradingCalendar.from_dates(pickle.load(f))}
+    index = _read_cal_index(local_cal)
+    return {name: _map_cal_section(local_cal, section) for name, section in index.items() if name not in (_UNION, _INTERSECTION)}
+
+
+def _convert_pickle_cal(local_cal: str, output: str) -> TradingCalendar:
+    """
+    将旧版 pickle 格式的交易日历转换为二进制格式，返回默认交易所的交易日历
+        - 二进制文件不存在时直接转换
+        - 二进制文件已存在时只合并默认交易所: 覆盖区间内保留已有交易日，只补充 pickle 中超出覆盖区间的交易日，
+          覆盖区间取两者中较大的范围，其他交易所的交易日历保持不变
+    """
+    legacy = _read_cal_store(local_cal)[_DEFAULT_EXCHANGE]
+    with _store_lock(output):
+        calendars = _read_cal_store(output) if os.path.exists(output) else dict()
+        current = calendars.get(_DEFAULT_EXCHANGE)
+        if current is None:
+            calendars[_DEFAULT_EXCHANGE] = legacy
+        elif legacy.valid_from <= current.valid_through + 1 and legacy.valid_through >= current.valid_from - 1:
+            # 两者覆盖区间相交或相邻时才合并，否则中间的空缺会被误认为已覆盖
+            outside = legacy.days[(legacy.days < current.valid_from) | (legacy.days > current.valid_through)]
+            calendars[_DEFAULT_EXCHANGE] = TradingCalendar(
+                np.union1d(current.days, outside).astype(np.int32),
+                min(current.valid_from, legacy.valid_from),
+                max(current.valid_through, legacy.valid_through))
+        try:
+            _dump_cal_store(calendars, output)
+        except OSError:
+            # 目录不可写时直接使用内存中的交易日历
+            return calendars[_DEFAULT_EXCHANGE]
+    return _map_cal_section(output, _read_cal_index(output)[_DEFAULT_EXCHANGE])
+
+
+def _file_signature(path: str) -> Union[Tuple[int, int, int], None]:
+    """
+    文件的修改时间、大小及 inode，文件被替换或修改后会变化
+    """
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+
+
+class CalendarCache:
+    """
+    线程安全、可自动失效的交易日历缓存
+        - 缓存键为规范化后的 (文件绝对地址, 交易所)，None 与默认地址、"sse" 与 "SSE" 共用同一缓存
+        - 每隔 check_interval 秒检查一次文件的修改时间、大小及 inode，变化后重新导入，
+          check_interval 为 0 时每次都检查，为 None 时不检查
+        - 调用 `invalidate` 递增缓存代数，之前导入的交易日历在下次访问时全部重新导入
+        - 重新导入完成后整体替换缓存项，并发读取方要么拿到旧的交易日历，要么拿到新的交易日历，
+          同一缓存键同一时刻只有一个线程导入
+        - hits/misses/reloads 分别为命中、首次导入、重新导入次数 (命中次数在多线程下为近似值)，
+          load_seconds 为导入累计耗时
+        - `prefetch` 在后台线程导入，`aget` 在事件循环中等待后台导入，均不阻塞调用方
+
+    Args:
+        loader: 导入函数，(文件地址, 交易所) -> (交易日历, 实际读取的文件, 文件签名)
+        check_interval: 检查文件是否更新的间隔秒数
+    """
+
+    def __init__(self, loader, check_interval: float=1.0):
+        self._loader = loader
+        self.check_interval = check_interval
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.reloads = 0
+        self.load_seconds = 0.0
+        self.last_load_seconds = 0.0
+        # 原始参数 (默认地址及绝对地址) -> 规范化缓存键，规范化缓存键 -> (交易日历, 文件, 文件签名, 缓存代数, 上次检查时间)
+        self._keys = dict()
+        self._entries = dict()
+        self._lock = threading.Lock()
+        self._load_locks = dict()
+        self._prefetches = dict()
+
+    @staticmethod
+    def _normalize(local_cal: str=None, exchange: str=None) -> Tuple[str, str]:
+        return os.path.abspath(local_cal or _config_path("trade_cal.bin")), _normalize_exchange(exchange)
+
+    def get(self, local_cal: str=None, exchange: str=None) -> TradingCalendar:
+        """
+        查询缓存，缓存缺失、文件已更新或缓存已失效时导入
+        """
+        key = self._key(local_cal, exchange)
+        entry = self._entries.get(key)
+        if entry is not None and entry[3] == self.generation and (
+            self.check_interval is None or time.monotonic() - entry[4] < self.check_interval or self._revalidate(key, entry)
+        ):
+            # 命中为热点路径，不加锁计数
+            self.hits += 1
+            return entry[0]
+        return self._load(key, entry)
+
+    def _key(self, local_cal: str=None, exchange: str=None) -> Tuple[str, str]:
+        # 相对地址依赖当前工作目录，每次重新规范化，只记录默认地址及绝对地址
+        if local_cal is not None and not os.path.isabs(local_cal):
+            return self._normalize(local_cal, exchange)
+        key = self._keys.get((local_cal, exchange))
+        if key is None:
+            key = self._keys.setdefault((local_cal, exchange), self._normalize(local_cal, exchange))
+        return key
+
+    def prefetch(self, local_cal: str=None, exchange: str=None) -> Future:
+        """
+        在后台线程导入交易日历，立即返回 `concurrent.futures.Future`
+            - 已缓存时返回已完成的 Future，不启动线程
+            - 同一缓存键正在后台导入时返回同一个 Future，不重复导入
+            - 后台导入与 `get` 共用导入锁，导入期间的同步查询等待同一次导入完成后直接使用其结果
+            - 导入失败时异常保存在 Future 中，不写入缓存，下次查询时重新导入
+        """
+        key = self._key(local_cal, exchange)
+        entry = self._entries.get(key)
+        if entry is not None and entry[3] == self.generation:
+            future = Future()
+            future.set_result(entry[0])
+            return future
+        with self._lock:
+            future = self._prefetches.get(key)
+            if future is not None:
+                return future
+            future = self._prefetches[key] = Future()
+
+        def run():
+            try:
+                if future.set_running_or_notify_cancel():
+                    future.set_result(self.get(local_cal, exchange))
+            except BaseException as e:
+                future.set_exception(e)
+            finally:
+                with self._lock:
+                    self._prefetches.pop(key, None)
+
+        threading.Thread(target=run, name=f"hchyt-prefetch-{key[1]}", daemon=True).start()
+        return future
+
+    async def aget(self, local_cal: str=None, exchange: str=None) -> TradingCalendar:
+        """
+        `get` 的异步版本，导入在后台线程中进行 (见 `prefetch`)，不阻塞事件循环，
+        并发调用方等待同一次导入，某个调用方被取消时不影响其他调用方
+        """
+        import asyncio
+
+        return await asyncio.shield(asyncio.wrap_future(self.prefetch(local_cal, exchange)))
+
+    def _revalidate(self, key: Tuple[str, str], entry: tuple) -> bool:
+        now = time.monotonic()
+        if _file_signature(entry[1]) != entry[2]:
+            return False
+        # 文件未更新，只更新检查时间
+        self._entries[key] = entry[:4] + (now,)
+        return True
+
+    def _load(self, key: Tuple[str, str], entry: tuple) -> TradingCalendar:
+        with self._lock:
+            load_lock = self._load_locks.setdefault(key, threading.Lock())
+        with load_lock:
+            # 等待期间其他线程可能已经重新导入
+            current = self._entries.get(key)
+            if current is not None and current[0] is not (entry and entry[0]) and current[3] == self.generation:
+                with self._lock:
+                    self.hits += 1
+                return current[0]
+            start = time.perf_counter()
+            trade_cal, path, signature = self._loader(*key)
+            seconds = time.perf_counter() - start
+            self._entries[key] = (trade_cal, path, signature, self.generation, time.monotonic())
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+            else:
+                self.reloads += 1
+            self.load_seconds += seconds
+            self.last_load_seconds = seconds
+        return trade_cal
+
+    def invalidate(self) -> None:
+        """
+        使所有缓存的交易日历失效，下次访问时重新导入
+        """
+        with self._lock:
+            self.generation += 1
+
+    def clear(self) -> None:
+        """
+        清空缓存及统计信息
+        """
+        with self._lock:
+            self._keys.clear()
+            self._entries.clear()
+            self.hits = self.misses = self.reloads = 0
+            self.load_seconds = self.last_load_seconds = 0.0
+
+    def stats(self) -> Dict[str, Union[int, float]]:
+        """
+        缓存统计信息
+        """
+        with self._lock:
+            loads = self.misses + self.reloads
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "reloads": self.reloads,
+                "entries": len(self._entries),
+                "generation": self.generation,
+                "load_seconds": self.load_seconds,
+                "last_load_seconds": self.last_load_seconds,
+                "mean_load_seconds": self.load_seconds / loads if loads else 0.0,
+            }
+
+
+def _load_calendar(local_cal: str, exchange: str) -> Tuple[TradingCalendar, str, Tuple[int, int, int]]:
+    """
+    导入指定交易所的交易日历，返回 (交易日历, 实际读取的文件, 读取前的文件签名)
+    """
+    # 1. 旧版 pickle 格式交易日历转换
+    legacy_cal = None
+    if local_cal == os.path.abspath(_config_path("trade_cal.bin")):
+        if os.path.exists(_config_path("trade_cal.pickle")):
+            legacy_cal = _config_path("trade_cal.pickle")
+    elif os.path.exists(local_cal) and not _is_cal_file(local_cal):
+        legacy_cal = local_cal
+        local_cal = os.path.splitext(local_cal)[0] + ".bin"
+    # 二进制文件比 pickle 文件新时不再转换，否则将 pickle 中的交易日合并到已有的二进制文件
+    if legacy_cal and os.path.exists(local_cal) and os.path.getmtime(local_cal) >= os.path.getmtime(legacy_cal):
+        legacy_cal = None
+    if legacy_cal:
+        trade_cal = _convert_pickle_cal(legacy_cal, local_cal)
+        if exchange == _DEFAULT_EXCHANGE:
+            path = local_cal if os.path.exists(local_cal) else legacy_cal
+            return trade_cal, path, _file_signature(path)
+
+    # 2. 本地文件或交易所缺失时进行网络获取，获取前加锁并再次检查，多个线程同时缺失时只获取一次
+    if not os.path.exists(local_cal):
+        with _store_lock(local_cal):
+            if not os.path.exists(local_cal):
+                gen_trade_calendar(output=local_cal, exchange=exchange)
+    signature = _file_signature(local_cal)
+    index = _read_cal_index(local_cal)
+    if exchange not in index and exchange not in (_UNION, _INTERSECTION):
+        with _store_lock(local_cal):
+            gen_trade_calendar(output=local_cal, exchange=exchange, incremental=True)
+        signature = _file_signature(local_cal)
+        index = _read_cal_index(local_cal)
+    if exchange not in index:
+        raise ValueError(f"[ERROR]\t交易日历文件 {local_cal} 中没有 {exchange} 交易日历")
+
+    return _map_cal_section(local_cal, index[exchange]), local_cal, signature
+
+
+calendar_cache = CalendarCache(_load_calendar)
+
+
+def load_calendar(local_cal: str=None, exchange: str=None) -> TradingCalendar:
+    """
+    导入指定交易所的交易日历，并构造为 `TradingCalendar` 对象，本地日历文件不存在则进行网络全量获取
+        - 交易日历文件为二进制格式: 文件头 (魔数 "HCHYTCAL"、版本号) + 按交易所划分的目录 + 小端 int32 天数序号数组
+        - 每个交易所的交易日历在首次查询时才通过 `numpy.memmap` 零拷贝读取，多个进程共享同一份页缓存
+        - 本地文件中没有指定交易所时，增量获取该交易所的交易日历并写入同一文件
+        - "UNION"/"INTERSECTION" 为文件中所有交易所交易日历的并集/交集，写入时预先计算，
+          只覆盖所有交易所共同覆盖的区间，某个交易所覆盖区间较短时并集也随之缩短，超出共同区间的查询抛出 ValueError
+        - 旧版 pickle 格式的交易日历在首次使用时自动转换为同名 ".bin" 文件
+        - 导入结果由 `calendar_cache` 缓存，文件更新后自动重新导入 (见 `CalendarCache`)
+
+    Args:
+        local_cal: 本地日历文件，默认为 ~/.config/trade_cal.bin，不存在时尝试转换 ~/.config/trade_cal.pickle
+        exchange: 交易所代码，默认为 "SSE"
+    """
+    return calendar_cache.get(local_cal, exchange)
+
+
+def prefetch(local_cal: str=None, exchange: str=None) -> Future:
+    """
+    在后台线程预先导入交易日历 (本地文件不存在时进行网络获取)，立即返回 `concurrent.futures.Future`，
+    导入完成后同步查询函数直接使用缓存，不再等待网络，适合在进程启动时调用，见 `CalendarCache.prefetch`
+        - 也可在导入 hchyt 前设置环境变量 HCHYT_PREFETCH 为逗号分隔的交易所代码 (如 "SSE,SZSE")，导入时自动预先导入
+
+    Args:
+        local_cal: 本地日历文件，默认为 ~/.config/trade_cal.bin
+        exchange: 交易所代码，默认为 "SSE"
+
+    Returns:
+        Future: 结果为 `TradingCalendar`
+    """
+    return calendar_cache.prefetch(local_cal, exchange)
+
+
+async def aprefetch(local_cal: str=None, exchange: str=None) -> TradingCalendar:
+    """
+    `prefetch` 的异步版本，在事件循环中等待后台导入完成，并发调用方共享同一次导入
+
+    Args:
+        local_cal: 本地日历文件，默认为 ~/.config/trade_cal.bin
+        exchange: 交易所代码，默认为 "SSE"
+
+    Returns:
+        TradingCalendar: 交易日历
+    """
+    return await calendar_cache.aget(local_cal, exchange)
+
+
+def get_real_trade_date(
+    cursor_date: Union[str, datetime.date, pd.Timestamp] = None, 
+    direction: int=-1,
+    trade_cal_file: str=None,
+    exchange: str=None,
+    output: str="str") -> Union[str, int, datetime.date]:
+    """
+    获取指定日期附近真正的交易日
+    - 如果指定日期为交易日则返回指定日期，否则根据指定方向查询真实股票交易日
+    - 如果没有指定日期，默认以当日作为输入，往历史回溯作为方向
+
+    Args:
+        cursor_date: 指定日期
+        direction: 查询方式，默认为 -1， 即往历史回溯
+        trade_cal_file: 交易日历存放地址，默认为 None，从用户主目录下的 ".config/trade_cal.bin" 读取
+        exchange: 交易所代码，默认为 "SSE"，"UNION"/"INTERSECTION" 为所有交易所交易日历在共同覆盖区间上的并集/交集
+        output: 输出类型，"str" 为 "YYYY-mm-dd" 格式，"date" 为 datetime.date，"day" 为天数序号
+    """
+    if not cursor_date:
+        cursor_date = datetime.date.today()
+    return load_calendar(trade_cal_file, exchange).snap(cursor_date, direction, output)
+       
+
+def get_pre_trade_date(
+    cursor_date: Union[str, pd.Timestamp, datetime.date]=None, 
+    n: int=1,
+    inclusive: bool=False,
+    exchange: str=None,
+    output: str="str") -> Union[str, int, datetime.date]:
+    """
+    获取指定日期回溯 N 日的历史交易日，当不指定日期时，从当前日期往历史回溯，注意：
+    - 当 inclusive 为 True 的时候，如果 cursor_date 为交易日，往前回溯一个交易日即为 cursor_date
+    - 当 inclusive 为 False 的时候
+      - 如果 cursor_date 为交易日，往前回溯一个交易日为 cursor_date 往历史继续回溯一个交易日
+      - 如果 cursor_date 为非交易日，往前回溯一个交易日即为往历史看，距离当前最近的交易日
+
+    Args:
+        cursor_date: 指定日期，默认为空，即当前日期往历史回溯 (默认不包含当前日期)
+        n: 往历史回溯的交易日数目，注意 n 必须为正整数
+        inclusive: 当 cursor_date 为交易日的时候，是否包含 cursor_date
+        exchange: 交易所代码，默认为 "SSE"，"UNION"/"INTERSECTION" 为所有交易所交易日历在共同覆盖区间上的并集/交集
+        output: 输出类型，"str" 为 "YYYY-mm-dd" 格式，"date" 为 datetime.date，"day" 为天数序号
+
+    Return:
+        交易日，默认为 "YYYY-mm-dd" 格式
+    """
+    assert isinstance(n, int) and n > 0
+    if not cursor_date:
+        cursor_date = datetime.date.today()
+    return load_calendar(exchange=exchange).shift(cursor_date, -n, inclusive, output)
+
+
+def get_next_trade_date(
+    cursor_date: Union[str, pd.Timestamp, datetime.date]=None, 
+    n: int=1,
+    inclusive: bool=False,
+    exchange: str=None,
+    output: str="str") -> Union[str, int, datetime.date]:
+    """
+    获取指定日期未来 N 日的交易日，当不指定日期时，从当前日期往未来推演，注意：
+    - 当 inclusive 为 True 的时候，如果 cursor_date 为交易日，往前推演一个交易日即为 cursor_date
+    - 当 inclusive 为 False 的时候
+      - 如果 cursor_date 为交易日，往前推演一个交易日为 cursor_date 往未来继续推演一个交易日
+      - 如果 cursor_date 为非交易日，往前推演一个交易日即为往未来看，距离当前最近的交易日
+
+    Args:
+        cursor_date: 指定日期，默认为空，即当前日期往未来推演 (默认不包含当前日期)
+        n: 往未来推演的交易日数目，注意 n 必须为正整数
+        inclusive: 当 cursor_date 为交易日的时候，是否包含 cursor_date
+        exchange: 交易所代码，默认为 "SSE"，"UNION"/"INTERSECTION" 为所有交易所交易日历在共同覆盖区间上的并集/交集
+        output: 输出类型，"str" 为 "YYYY-mm-dd" 格式，"date" 为 datetime.date，"day" 为天数序号
+
+    Return:
+        交易日，默认为 "YYYY-mm-dd" 格式
+    """
+    assert isinstance(n, int) and n > 0
+    if not cursor_date:
+        cursor_date = datetime.date.today()
+    return load_calendar(exchange=exchange).shift(cursor_date, n, inclusive, output)
+
+
+def get_real_trade_dates(
+    cursor_dates: Union[np.ndarray, pd.Series, pd.Index, List[str]],
+    direction: int=-1,
+    trade_cal_file: str=None,
+    exchange: str=None):
+    """
+    `get_real_trade_date` 的批量版本，对每个日期查询附近真正的交易日，返回与输入相同的容器类型
+
+    Args:
+        cursor_dates: 日期序列，支持 numpy datetime64 数组、pandas Series/Index、字符串列表
+        direction: 查询方式，默认为 -1， 即往历史回溯
+        trade_cal_file: 交易日历存放地址，默认为 None，从用户主目录下的 ".config/trade_cal.bin" 读取
+        exchange: 交易所代码，默认为 "SSE"，"UNION"/"INTERSECTION" 为所有交易所交易日历在共同覆盖区间上的并集/交集
+
+    Returns:
+        与输入相同容器类型的交易日序列
+    """
+    days, mask = _to_days_array(cursor_dates)
+    return _from_days_array(load_calendar(trade_cal_file, exchange).snap_days(days, direction, mask), mask, cursor_dates)
+
+
+def get_pre_trade_dates(
+    cursor_dates: Union[np.ndarray, pd.Series, pd.Index, List[str]],
+    n: int=1,
+    inclusive: bool=False,
+    exchange: str=None):
+    """
+    `get_pre_trade_date` 的批量版本，对每个日期回溯 N 个交易日，返回与输入相同的容器类型
+
+    Args:
+        cursor_dates: 日期序列，支持 numpy datetime64 数组、pandas Series/Index、字符串列表
+        n: 往历史回溯的交易日数目，注意 n 必须为正整数
+        inclusive: 当日期为交易日的时候，是否包含该日期
+        exchange: 交易所代码，默认为 "SSE"，"UNION"/"INTERSECTION" 为所有交易所交易日历在共同覆盖区间上的并集/交集
+
+    Returns:
+        与输入相同容器类型的交易日序列
+    """
+    assert isinstance(n, int) and n > 0
+    days, mask = _to_days_array(cursor_dates)
+    return _from_days_array(load_calendar(exchange=exchange).shift_days(days, -n, inclusive, mask), mask, cursor_dates)
+
+
+def get_next_trade_dates(
+    cursor_dates: Union[np.ndarray, pd.Series, pd.Index, List[str]],
+    n: int=1,
+    inclusive: bool=False,
+    exchange: str=None):
+    """
+    `get_next_trade_date` 的批量版本，对每个日期推演 N 个交易日，返回与输入相同的容器类型
+
+    Args:
+        cursor_dates: 日期序列，支持 numpy datetime64 数组、pandas Series/Index、字符串列表
+        n: 往未来推演的交易日数目，注意 n 必须为正整数
+        inclusive: 当日期为交易日的时候，是否包含该日期
+        exchange: 交易所代码，默认为 "SSE"，"UNION"/"INTERSECTION" 为所有交易所交易日历在共同覆盖区间上的并集/交集
+
+    Returns:
+        与输入相同容器类型的交易日序列
+    """
+    assert isinstance(n, int) and n > 0
+    days, mask = _to_days_array(cursor_dates)
+    return _from_days_array(load_calendar(exchange=exchange).shift_days(days, n, inclusive, mask), mask, cursor_dates)
+
+
+def get_trade_dates(
+    start_date: Union[str, int, datetime.date, pd.Timestamp],
+    end_date: Union[str, int, datetime.date, pd.Timestamp],
+    exchange: str=None,
+    output: str="str",
+    inclusive: str="both",
+    view: bool=False) -> Union[List[Union[str, int, datetime.date]], TradeDateRange]:
+    """
+    获取指定日期之间的交易日，默认 start_date/end_date 为交易日时包含在交易日范围内
+
+    Args:
+        start_date (Union[str, datetime.date, pd.Timestamp]): 开始日期
+        end_date (Union[str, datetime.date, pd.Timestamp]): 结束时间
+        exchange (str): 交易所代码，默认为 "SSE"，"UNION"/"INTERSECTION" 为所有交易所交易日历在共同覆盖区间上的并集/交集
+        output (str): 输出类型，"str" 为 "YYYY-mm-dd" 格式，"date" 为 datetime.date，"day" 为天数序号
+        inclusive (str): 端点的包含方式，"both" (默认)、"left"、"right"、"neither"
+        view (bool): 是否返回交易日区间视图 (不复制交易日)，见 `TradingCalendar.view`
+
+    Returns:
+        List: 交易日范围，view 为 True 时返回 TradeDateRange
+    """
+    trade_cal = load_calendar(exchange=exchange)
+    if (to_day(start_date) < trade_cal.valid_from) or (to_day(end_date) > trade_cal.valid_through):
+        raise ValueError(f"[ERROR]\t输入的日期范围 [{start_date}, {end_date}] 有越界，请检查日期是否在交易日历范围 [{_to_str(trade_cal.valid_from)}, {_to_str(trade_cal.valid_through)}] 内")
+    trade_dates = trade_cal.view(start_date, end_date, inclusive, output)
+    return trade_dates if view else trade_dates.tolist()
+
+
+def iter_trade_windows(
+    start_date: Union[str, int, datetime.date, pd.Timestamp],
+    end_date: Union[str, int, datetime.date, pd.Timestamp],
+    size: int,
+    step: int=1,
+    expanding: bool=False,
+    exchange: str=None,
+    inclusive: str="both",
+    output: str="str") -> Iterator[TradeDateRange]:
+    """
+    逐个生成指定日期之间 size 个交易日的滚动窗口 (或扩展窗口)，见 `TradingCalendar.windows`
+
+    Args:
+        start_date: 开始日期
+        end_date: 结束日期
+        size: 滚动窗口长度，扩展窗口的最小长度
+        step: 相邻窗口结束日之间的交易日数目
+        expanding: 是否为扩展窗口
+        exchange: 交易所代码，默认为 "SSE"，"UNION"/"INTERSECTION" 为所有交易所交易日历在共同覆盖区间上的并集/交集
+        inclusive: 端点的包含方式，"both" (默认)、"left"、"right"、"neither"
+        output: 元素类型，"str" 为 "YYYY-mm-dd" 格式，"date" 为 datetime.date，"day" 为天数序号
+
+    Returns:
+        Iterator[TradeDateRange]: 窗口生成器
+    """
+    return load_calendar(exchange=exchange).windows(start_date, end_date, size, step, expanding, inclusive, output)
+
+
+def count_trade_days(start_date: Union[str, int, datetime.date, pd.Timestamp], end_date: Union[str, int, datetime.date, pd.Timestamp], exchange: str=None) -> int:
+    """
+    获取 [start_date, end_date] 闭区间内的交易日数目，不构造交易日列表
+
+    Args:
+        start_date: 开始日期
+        end_date: 结束日期
+        exchange: 交易所代码，默认为 "SSE"，"UNION"/"INTERSECTION" 为所有交易所交易日历在共同覆盖区间上的并集/交集
+
+    Returns:
+        int: 交易日数目
+    """
+    return load_calendar(exchange=exchange).count(start_date, end_date)
+
+
+def get_period_trade_date(
+    cursor_date: Union[str, int, datetime.date, pd.Timestamp]=None,
+    period: str="month",
+    n: int=0,
+    exchange: str=None,
+    output: str="str") -> Union[str, int, datetime.date]:
+    """
+    获取指定日期所在周期 (周、月、季、年) 的第 n 个交易日，见 `TradingCalendar.period_nth`
+
+    Args:
+        cursor_date: 指定日期，默认为当前日期
+        period: 周期，"week"/"month"/"quarter"/"year"
+        n: 周期内序号，0 为周期第一个交易日，-1 为周期最后一个交易日
+        exchange: 交易所代码，默认为 "SSE"，"UNION"/"INTERSECTION" 为所有交易所交易日历在共同覆盖区间上的并集/交集
+        output: 输出类型，"str" 为 "YYYY-mm-dd" 格式，"date" 为 datetime.date，"day" 为天数序号
+    """
+    if not cursor_date:
+        cursor_date = datetime.date.today()
+    return load_calendar(exchange=exchange).period_nth(cursor_date, period, n, output)
+
+
+def get_period_trade_dates(
+    period: str="month",
+    n: int=-1,
+    start_date: Union[str, int, datetime.date, pd.Timestamp]=None,
+    end_date: Union[str, int, datetime.date, pd.Timestamp]=None,
+    exchange: str=None,
+    output: str="str") -> List[Union[str, int, datetime.date]]:
+    """
+    获取每个周期 (周、月、季、年) 的第 n 个交易日，用于生成调仓日期，见 `TradingCalendar.period_days`
+        - 每月最后一个交易日: get_period_trade_dates("month", -1)
+        - 每周第一个交易日: get_period_trade_dates("week", 0)
+        - 每季第 3 个交易日: get_period_trade_dates("quarter", 2)
+
+    Args:
+        period: 周期，"week"/"month"/"quarter"/"year"
+        n: 周期内序号，0 为周期第一个交易日，-1 为周期最后一个交易日
+        start_date: 开始日期，默认不限
+        end_date: 结束日期，默认不限
+        exchange: 交易所代码，默认为 "SSE"，"UNION"/"INTERSECTION" 为所有交易所交易日历在共同覆盖区间上的并集/交集
+        output: 输出类型，"str" 为 "YYYY-mm-dd" 格式，"date" 为 datetime.date，"day" 为天数序号
+
+    Returns:
+        List: 交易日列表
+    """
+    return load_calendar(exchange=exchange).period_days(period, n, start_date, end_date, output)
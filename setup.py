@@ -13,6 +13,9 @@ setuptools.setup(
     long_description_content_type="text/markdown",
     url="https://github.com/nehcuh/hchyt",
     packages=setuptools.find_packages(),
+    entry_points={
+        "console_scripts": ["hchyt = hchyt.cli:main"],
+    },
     classifiers=[
         "Programming Language :: Python :: 3",
         "License :: OSI Approved :: MIT License",
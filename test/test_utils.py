@@ -1,17 +1,48 @@
+import numpy as np
 import pandas as pd
+import pytest
 import os
 import sys
 
-sys.path.append("../hchyt")
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
 
-from utils import (
+from hchyt.utils import (
     gen_trade_calendar, 
     load_trade_cal, 
+    load_calendar,
+    prefetch,
+    aprefetch,
     get_real_trade_date, 
     get_pre_trade_date, 
     get_next_trade_date,
     fmt_symbols,
-    get_trade_time_type
+    convert_symbols,
+    get_trade_time_type,
+    get_trade_time_types,
+    get_bar_index,
+    shift_trade_minutes,
+    load_clock,
+    get_real_trade_dates,
+    get_pre_trade_dates,
+    get_next_trade_dates,
+    TradingCalendar,
+    FakeProvider,
+    FileProvider,
+    RateLimiter,
+    set_calendar_provider,
+    calendar_cache,
+    to_day,
+    from_day,
+    count_trade_days,
+    get_period_trade_date,
+    get_period_trade_dates,
+    get_trade_dates,
+    iter_trade_windows,
+    gen_securities,
+    load_securities,
+    get_universe,
+    is_listed,
+    set_symbol_exchanges,
     )
 
 def test_gen_trade_calendar():
@@ -20,13 +51,225 @@ def test_gen_trade_calendar():
     """
     # 1. 测试输入起始时间，结束时间
     gen_trade_calendar(start_date="2020-03-01", end_date="2023-01-01")
-    assert os.path.exists(os.path.expanduser("~")+os.sep+".config"+os.sep+"trade_cal_20200301_20230101.pickle")
+    assert os.path.exists(os.path.expanduser("~")+os.sep+".config"+os.sep+"trade_cal_20200301_20230101.bin")
     # 2. 测试指定目录
     gen_trade_calendar(start_date="2020-03-01", end_date="2023-01-01", output="./test.pickle")
     assert os.path.exists("test.pickle")
     # 3. 测试默认参数
     gen_trade_calendar()
-    assert os.path.exists(os.path.expanduser("~")+os.sep+".config"+os.sep+"trade_cal.pickle")
+    assert os.path.exists(os.path.expanduser("~")+os.sep+".config"+os.sep+"trade_cal.bin")
+
+@pytest.fixture
+def fake_tushare(tmp_path, monkeypatch):
+    """
+    不访问网络的 tushare 接口，周一至周五为交易日 (港交所每月 11 日休市)，返回 (查询记录, 配置文件地址)
+    """
+    tushare = pytest.importorskip("tushare")
+    queries = []
+
+    def fake_trade_cal(start_date, end_date, closed_day=None):
+        cal_dates = pd.date_range(start_date, end_date)
+        is_open = (cal_dates.weekday < 5) & (cal_dates.day != closed_day)
+        return pd.DataFrame({"cal_date": cal_dates.strftime("%Y%m%d"), "is_open": is_open.astype(int)})
+
+    class FakePro:
+        def trade_cal(self, exchange, start_date, end_date):
+            queries.append((exchange, start_date, end_date))
+            return fake_trade_cal(start_date, end_date)
+
+        def hk_tradecal(self, start_date, end_date):
+            queries.append(("HKEX", start_date, end_date))
+            # 与 tushare 一致，按日期倒序返回，单次最多 2000 行
+            return fake_trade_cal(start_date, end_date, closed_day=11).iloc[::-1].head(2000)
+
+    monkeypatch.setattr(tushare, "set_token", lambda token: None)
+    monkeypatch.setattr(tushare, "pro_api", lambda: FakePro())
+    local_config = tmp_path / "user_info.toml"
+    local_config.write_text('[tushare]\ntoken = "xxx"\n')
+    return queries, str(local_config)
+
+def test_gen_trade_calendar_incremental(tmp_path, fake_tushare):
+    """
+    测试增量更新交易日历，只查询本地未覆盖的区间 
+    """
+    queries, local_config = fake_tushare
+    output = str(tmp_path / "trade_cal.bin")
+
+    gen_trade_calendar("2023-01-01", "2023-06-30", output=output, local_config=local_config)
+    gen_trade_calendar("2023-01-01", "2023-06-30", output=output, local_config=local_config, incremental=True)
+    assert queries == [("SSE", "20230101", "20230630")]
+    assert load_calendar(output).is_stale("2023-07-01")
+
+    gen_trade_calendar("2022-12-01", "2023-12-31", output=output, local_config=local_config, incremental=True)
+    assert queries[1:] == [("SSE", "20221201", "20221231"), ("SSE", "20230701", "20231231")]
+    trade_cal = load_calendar(output)
+    assert trade_cal.first == "2022-12-01" and trade_cal.last == "2023-12-29"
+    assert not trade_cal.is_stale("2023-12-31")
+    assert sorted(os.listdir(tmp_path)) == ["trade_cal.bin", "trade_cal.bin.lock", "user_info.toml"]
+
+def test_multi_exchange_calendar(tmp_path, fake_tushare):
+    """
+    测试同一文件保存多个交易所交易日历，以及交易日历的并集/交集 
+    """
+    queries, local_config = fake_tushare
+    output = str(tmp_path / "trade_cal.bin")
+    gen_trade_calendar("2023-01-01", "2023-03-31", output=output, local_config=local_config, exchange="SSE")
+    gen_trade_calendar("2023-01-01", "2023-02-28", output=output, local_config=local_config, exchange="HKEX")
+
+    assert "2023-01-11" in load_calendar(output, "SSE")
+    assert "2023-01-11" not in load_calendar(output, "HKEX")
+    assert "2023-01-10" == get_real_trade_date("2023-01-11", trade_cal_file=output, exchange="hkex")
+    union_cal = load_calendar(output, "UNION")
+    intersection_cal = load_calendar(output, "INTERSECTION")
+    assert union_cal.last == intersection_cal.last == "2023-02-28"
+    assert "2023-01-11" in union_cal and "2023-01-11" not in intersection_cal
+    assert len(queries) == 2
+
+    # 港交所长区间分页查询，不会因单次返回行数上限丢失早期交易日
+    hk_output = str(tmp_path / "hk_cal.bin")
+    gen_trade_calendar("2010-01-01", "2023-02-28", output=hk_output, local_config=local_config, exchange="HKEX")
+    hk_cal = load_calendar(hk_output, "HKEX")
+    assert hk_cal.first == "2010-01-01" and hk_cal.last == "2023-02-28" and "2015-06-11" not in hk_cal
+    assert len(queries) == 2 + 4
+    # 共同覆盖区间远小于单个交易所的覆盖区间时发出警告
+    with pytest.warns(UserWarning, match="UNION"):
+        gen_trade_calendar("2020-01-01", "2023-01-31", output=output, local_config=local_config, exchange="SSE", incremental=True)
+
+def test_calendar_providers(tmp_path, monkeypatch):
+    """
+    测试交易日历数据源: 文件数据源、并发请求合并、失败重试及限流
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    # 1. 文件数据源，只写入文件覆盖的区间
+    csv_file = tmp_path / "trade_cal.csv"
+    csv_file.write_text("exchange,cal_date,is_open\nSSE,20230103,1\nSSE,20230104,0\nSSE,20230105,1\nHKEX,20230103,1\n")
+    output = str(tmp_path / "file_cal.bin")
+    gen_trade_calendar(output=output, provider=FileProvider(str(csv_file)))
+    assert load_trade_cal(output) == ["2023-01-03", "2023-01-05"]
+    assert load_calendar(output).is_stale("2023-01-06")
+
+    # 2. 64 个线程同时导入缺失的交易日历，只查询一次
+    provider = FakeProvider(holidays=["2023-01-02"], latency=0.1)
+    set_calendar_provider(provider)
+    try:
+        output = str(tmp_path / "fake_cal.bin")
+        with ThreadPoolExecutor(64) as pool:
+            calendars = list(pool.map(lambda _: load_calendar(output), range(64)))
+    finally:
+        set_calendar_provider(None)
+    assert len(provider.queries) == 1
+    assert all("2023-01-03" in trade_cal and "2023-01-02" not in trade_cal for trade_cal in calendars)
+
+    # 3. 查询失败时指数退避重试
+    waits = []
+    monkeypatch.setattr("time.sleep", waits.append)
+    provider = FakeProvider()
+    fetch = provider._fetch
+    failures = iter([True, True, False])
+    def flaky_fetch(*args):
+        if next(failures):
+            raise ConnectionError
+        return fetch(*args)
+    provider._fetch = flaky_fetch
+    assert len(provider.fetch("SSE", 19360, 19366, retries=3, retry_wait=2)) == 5
+    assert waits == [2, 4]
+
+    # 4. 令牌桶限流
+    limiter = RateLimiter(rate=10, capacity=2)
+    assert [limiter.acquire() > 0 for _ in range(3)] == [False, False, True]
+
+
+def test_calendar_cache(tmp_path, monkeypatch):
+    """
+    测试交易日历缓存: 缓存键规范化、文件更新后自动重新导入及统计信息
+    """
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(calendar_cache, "check_interval", 0)
+    output = str(tmp_path / "cal.bin")
+    gen_trade_calendar("2023-01-01", "2023-01-31", output=output, provider=FakeProvider())
+    stats = calendar_cache.stats()
+
+    # 1. 相对地址与绝对地址、交易所大小写共用同一缓存
+    trade_cal = load_calendar(output)
+    assert load_calendar("cal.bin", "sse") is trade_cal
+    assert calendar_cache.stats()["misses"] == stats["misses"] + 1
+    assert calendar_cache.stats()["hits"] == stats["hits"] + 1
+
+    # 2. 其他进程替换文件后自动重新导入，读取方继续使用旧的交易日历不受影响
+    gen_trade_calendar("2023-01-01", "2023-02-28", output=str(tmp_path / "new.bin"), provider=FakeProvider())
+    os.replace(tmp_path / "new.bin", output)
+    assert load_calendar("cal.bin").last == "2023-02-28"
+    assert trade_cal.last == "2023-01-31"
+    assert calendar_cache.stats()["reloads"] == stats["reloads"] + 1
+    assert calendar_cache.stats()["last_load_seconds"] > 0
+
+    # 3. 相对地址按当前工作目录解析
+    os.makedirs(tmp_path / "other")
+    gen_trade_calendar("2023-01-01", "2023-03-31", output=str(tmp_path / "other" / "cal.bin"), provider=FakeProvider())
+    monkeypatch.chdir(tmp_path / "other")
+    assert load_calendar("cal.bin").last == "2023-03-31"
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="进程间写锁依赖 fcntl")
+def test_store_lock_across_processes(tmp_path):
+    """
+    测试多个进程同时向同一文件写入不同交易所的交易日历，互不覆盖
+    """
+    import subprocess
+    output = str(tmp_path / "trade_cal.bin")
+    code = (
+        "import sys\n"
+        "from hchyt.utils import gen_trade_calendar, FakeProvider\n"
+        "gen_trade_calendar('2023-01-01', '2023-01-31', output=sys.argv[1], exchange=sys.argv[2], incremental=True, provider=FakeProvider(latency=0.3))\n"
+    )
+    root = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+    exchanges = ["SSE", "SZSE", "BSE", "HKEX"]
+    workers = [subprocess.Popen([sys.executable, "-c", code, output, exchange], cwd=root) for exchange in exchanges]
+    assert [worker.wait() for worker in workers] == [0] * len(exchanges)
+    for exchange in exchanges:
+        assert load_calendar(output, exchange).last == "2023-01-31"
+
+
+def test_prefetch(tmp_path):
+    """
+    测试后台预先导入: 后台线程及事件循环中导入，并发调用方共享同一次导入
+    """
+    import asyncio
+
+    provider = FakeProvider(latency=0.2)
+    set_calendar_provider(provider)
+    try:
+        output = str(tmp_path / "prefetch_cal.bin")
+        future = prefetch(output)
+        assert not future.done() and prefetch(output) is future
+
+        async def gateway():
+            ticks = 0
+            task = asyncio.gather(*(aprefetch(output) for _ in range(8)))
+            while not task.done():
+                ticks += 1
+                await asyncio.sleep(0.01)
+            return ticks, await task
+
+        ticks, calendars = asyncio.run(gateway())
+    finally:
+        set_calendar_provider(None)
+    # 等待导入期间事件循环没有被阻塞
+    assert ticks > 5
+    assert len(provider.queries) == 1
+    assert all(trade_cal is future.result() for trade_cal in calendars)
+    assert load_calendar(output) is future.result()
+    assert prefetch(output).done()
+
+    # 环境变量触发的后台导入失败时记录日志
+    import subprocess
+    code = "import threading, hchyt\n[t.join() for t in threading.enumerate() if t is not threading.main_thread()]\n"
+    env = dict(os.environ, HOME=str(tmp_path), HCHYT_PREFETCH="SSE")
+    root = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+    result = subprocess.run([sys.executable, "-c", code], cwd=root, env=env, check=True, capture_output=True, text=True)
+    assert "SSE" in result.stderr and "Traceback" in result.stderr
+
 
 def test_load_trade_cal():
     """
@@ -34,6 +277,55 @@ def test_load_trade_cal():
     """
     assert pd.Timestamp("2022-12-30") in load_trade_cal()
 
+def test_binary_trade_cal(tmp_path, monkeypatch):
+    """
+    测试旧版 pickle 交易日历自动转换为二进制格式，并通过内存映射读取 
+    """
+    legacy_cal = tmp_path / "trade_cal.pickle"
+    legacy_cal.write_bytes(open(os.path.join(os.path.dirname(__file__), "test.pickle"), "rb").read())
+    cal = load_calendar(str(legacy_cal))
+    assert (tmp_path / "trade_cal.bin").exists()
+    assert len(cal) == 728 and cal.first == "2020-01-02" and cal.last == "2022-12-30"
+    mapped_cal = load_calendar(str(tmp_path / "trade_cal.bin"))
+    assert isinstance(mapped_cal.days.base, np.memmap)
+    assert (mapped_cal.days == cal.days).all()
+    assert "2022-12-30" == load_trade_cal(str(tmp_path / "trade_cal.bin"))[-1]
+    # 默认地址: pickle 比二进制文件新时只合并默认交易所，保留其他交易所及较大的覆盖区间
+    from hchyt.tradecal import _load_calendar, _read_cal_index
+    monkeypatch.setenv("HOME", str(tmp_path))
+    os.makedirs(tmp_path / ".config")
+    default_cal = str(tmp_path / ".config" / "trade_cal.bin")
+    for exchange in ("SSE", "HKEX"):
+        gen_trade_calendar("2022-12-01", "2023-03-31", output=default_cal, exchange=exchange, provider=FakeProvider())
+    os.utime(default_cal, (0, 0))
+    (tmp_path / ".config" / "trade_cal.pickle").write_bytes(legacy_cal.read_bytes())
+    with pytest.warns(UserWarning, match="UNION"):
+        merged_cal = _load_calendar(default_cal, "SSE")[0]
+    assert merged_cal.first == "2020-01-02" and merged_cal.last == "2023-03-31"
+    assert "2022-06-06" in merged_cal and "2023-02-01" in merged_cal
+    assert list(_read_cal_index(default_cal)) == ["SSE", "HKEX", "UNION", "INTERSECTION"]
+    assert os.path.getmtime(default_cal) >= os.path.getmtime(tmp_path / ".config" / "trade_cal.pickle")
+
+def test_to_day():
+    """
+    测试日期规范化: 各种输入转换为天数序号，以及按指定类型输出
+    """
+    import datetime
+    day = (datetime.date(2023, 1, 13) - datetime.date(1970, 1, 1)).days
+    for cursor_date in ["2023-01-13", "20230113", "2023/01/13", "2023-01-13 09:30:00", 20230113, day,
+                        datetime.date(2023, 1, 13), datetime.datetime(2023, 1, 13, 15), np.datetime64("2023-01-13"), pd.Timestamp("2023-01-13")]:
+        assert to_day(cursor_date) == day
+    assert from_day(day) == "2023-01-13"
+    assert from_day(day, "date") == datetime.date(2023, 1, 13)
+    assert get_pre_trade_date(20230113, output="day") == day - 1
+    assert get_next_trade_date("20230113", output="date") == datetime.date(2023, 1, 16)
+    assert list(get_pre_trade_dates(np.array([20230113, 20230116]))) == ["2023-01-12", "2023-01-13"]
+    shifted = get_pre_trade_dates(np.array(["20230113", "20230116"]))
+    assert shifted.dtype == "<U10" and shifted.tolist() == ["2023-01-12", "2023-01-13"]
+    with pytest.raises(ValueError):
+        from_day(day, "timestamp")
+
+
 def test_get_real_trade_date():
     """
     测试获取真实交易日 
@@ -64,6 +356,184 @@ def test_get_next_trade_date():
     assert "2023-01-17" == get_next_trade_date("2023-01-13", n=2)
     assert "2023-01-16" == get_next_trade_date("2023-01-13", n=2, inclusive=True)
 
+def test_batch_trade_dates():
+    """
+    测试批量交易日查询 
+    """
+    assert ["2022-12-30", "2023-01-13"] == get_real_trade_dates(["2022-12-31", "2023-01-15"])
+    assert ["2023-01-13", "2023-01-12"] == get_pre_trade_dates(["2023-01-15", "2023-01-13"])
+    assert ["2023-01-16", "2023-01-16"] == get_next_trade_dates(["2023-01-15", "2023-01-16"], inclusive=True)
+    dates = pd.Series(pd.to_datetime(["2023-01-15", None]), name="date")
+    shifted = get_pre_trade_dates(dates, n=2)
+    assert isinstance(shifted, pd.Series) and shifted.name == "date"
+    assert shifted.iloc[0] == pd.Timestamp("2023-01-12") and pd.isna(shifted.iloc[1])
+    index = get_next_trade_dates(pd.DatetimeIndex(["2023-01-13"]), n=2)
+    assert isinstance(index, pd.DatetimeIndex) and index[0] == pd.Timestamp("2023-01-17")
+    aware = get_real_trade_dates(pd.DatetimeIndex(["2023-01-15 10:00"]).tz_localize("Asia/Shanghai"))
+    assert str(aware.tz) == "Asia/Shanghai" and aware[0] == pd.Timestamp("2023-01-13", tz="Asia/Shanghai")
+
+def test_trading_calendar():
+    """
+    测试基于数组的交易日历 
+    """
+    cal = TradingCalendar.from_dates(["2023-01-13", "2023-01-12", "2023-01-16", "2023-01-17", "2023-01-18"])
+    assert len(cal) == 5
+    assert "2023-01-13" in cal
+    assert "2023-01-14" not in cal
+    assert cal.first == "2023-01-12" and cal.last == "2023-01-18"
+    assert cal.index("2023-01-16") == 2
+    assert "2023-01-13" == cal.snap("2023-01-15")
+    assert "2023-01-16" == cal.snap("2023-01-15", direction=1)
+    assert "2023-01-12" == cal.shift("2023-01-15", -2)
+    assert "2023-01-17" == cal.shift("2023-01-16", 1)
+    assert "2023-01-16" == cal.shift("2023-01-16", 1, inclusive=True)
+    assert ["2023-01-13", "2023-01-16"] == cal.range("2023-01-13", "2023-01-16")
+    with pytest.raises(ValueError):
+        cal.shift("2023-01-12", -1)
+    with pytest.raises(ValueError):
+        cal.snap("2023-01-20")
+
+def test_get_trade_dates():
+    """
+    测试交易日区间视图: 包含两端、端点包含方式、切片、searchsorted 及滚动窗口
+    """
+    trade_cal = load_calendar()
+    assert isinstance(get_trade_dates("2022-06-01", "2022-06-10"), list)
+    trade_dates = get_trade_dates("2022-06-01", "2022-06-10", view=True)
+    assert trade_dates == ["2022-06-01", "2022-06-02", "2022-06-06", "2022-06-07", "2022-06-08", "2022-06-09", "2022-06-10"]
+    assert get_trade_dates("2022-06-01", "2022-06-10", inclusive="neither") == trade_dates[1:-1]
+    assert get_trade_dates("2022-06-01", "2022-06-10", inclusive="left")[-1] == "2022-06-09"
+    assert get_trade_dates("2022-06-01", "2022-06-10", output="day")[0] == to_day("2022-06-01")
+
+    # 视图不复制交易日
+    assert np.shares_memory(trade_dates.days, trade_cal.days)
+    assert trade_dates[2:4] == ["2022-06-06", "2022-06-07"] and np.shares_memory(trade_dates[::-1].days, trade_cal.days)
+    assert trade_dates.searchsorted("2022-06-05") == 2
+    assert list(trade_dates.searchsorted(["2022-06-01", "2022-06-11"], side="right")) == [1, 7]
+    assert (trade_dates.to_datetimeindex() == pd.DatetimeIndex(list(trade_dates))).all()
+    assert "2022-06-06" in trade_dates and "2022-06-05" not in trade_dates
+
+    # 交易日历首末交易日不再越界
+    assert len(get_trade_dates(trade_cal.first, trade_cal.last)) == len(trade_cal)
+
+    windows = list(iter_trade_windows("2022-06-01", "2022-06-10", 3, step=2))
+    assert [window.tolist() for window in windows] == [trade_dates[0:3], trade_dates[2:5], trade_dates[4:7]]
+    assert [len(window) for window in iter_trade_windows("2022-06-01", "2022-06-10", 5, expanding=True)] == [5, 6, 7]
+
+
+def test_period_trade_dates():
+    """
+    测试周期边界: 周期内序号、周期首末交易日及区间交易日数目
+    """
+    trade_cal = load_calendar()
+    assert get_period_trade_date("2022-06-06", "month", -1) == "2022-06-30"
+    assert get_period_trade_date("2022-06-04", "week", 0) == "2022-05-30"
+    assert trade_cal.period_index("2022-06-06", "month") == 2
+    month_ends = get_period_trade_dates("month", -1, "2022-01-01", "2022-12-31")
+    assert len(month_ends) == 12 and month_ends[5] == "2022-06-30"
+    assert get_period_trade_dates("year", 0, "2022-01-01", "2022-12-31") == ["2022-01-04"]
+
+    # 向量化查询与逐个查询一致
+    days = trade_cal.days[(trade_cal.days >= to_day("2022-01-01")) & (trade_cal.days <= to_day("2022-12-31"))]
+    ordinals = trade_cal.period_index_days(days, "quarter")
+    assert [trade_cal.period_index(int(day), "quarter") for day in days[::17]] == ordinals[::17].tolist()
+    assert (trade_cal.period_nth_days(days, "week", -1) == [get_period_trade_date(int(day), "week", -1, output="day") for day in days]).all()
+
+    assert count_trade_days("2022-01-01", "2022-12-31") == len(trade_cal.range("2022-01-01", "2022-12-31"))
+    assert count_trade_days("2022-12-31", "2022-01-01") == 0
+    with pytest.raises(ValueError):
+        get_period_trade_date("2022-06-06", "month", 30)
+
+    # 覆盖区间边缘: 正数序号只要求周期开始已覆盖，负数序号只要求周期结束已覆盖
+    import pickle
+    with open(os.path.join(os.path.dirname(__file__), "test.pickle"), "rb") as f:
+        legacy_cal = TradingCalendar.from_dates(pickle.load(f))
+    assert legacy_cal.first == "2020-01-02" and legacy_cal.last == "2022-12-30"
+    assert legacy_cal.period_nth("2022-12-15", "month", -1) == "2022-12-30"
+    assert legacy_cal.period_nth("2020-01-15", "month", 0) == "2020-01-02"
+    assert len(legacy_cal.period_days("month", -1, "2022-01-01", "2022-12-31")) == 12
+    assert legacy_cal.period_days("year", 0) == ["2020-01-02", "2021-01-04", "2022-01-04"]
+    assert legacy_cal.period_days("year", -1) == ["2020-12-31", "2021-12-31", "2022-12-30"]
+    edge_cal = TradingCalendar(legacy_cal.days[legacy_cal.days >= to_day("2022-06-15")], to_day("2022-06-15"))
+    assert edge_cal.period_nth("2022-06-20", "month", -1) == "2022-06-30"
+    with pytest.raises(ValueError):
+        edge_cal.period_nth("2022-06-20", "month", 0)
+
+
+def test_pandas_accessor():
+    """
+    测试 pandas 访问器: 偏移、吸附及对齐到交易日，面板数据不需要 unstack
+    """
+    import hchyt.accessor
+
+    events = pd.Series(pd.to_datetime(["2022-06-04", None, "2022-06-06"]))
+    assert events.hchyt.snap(direction=-1).dropna().dt.strftime("%Y-%m-%d").tolist() == ["2022-06-02", "2022-06-06"]
+    assert events.hchyt.shift_trading(1).dropna().dt.strftime("%Y-%m-%d").tolist() == ["2022-06-06", "2022-06-07"]
+
+    dates = pd.to_datetime(["2022-06-01", "2022-06-02", "2022-06-06"])
+    panel = pd.DataFrame({"factor": [1.0, 2.0, 3.0, 4.0, 5.0, 6.0]}, index=pd.MultiIndex.from_product([dates, ["A", "B"]], names=["date", "symbol"]))
+    shifted = panel.hchyt.shift_trading(1)
+    assert shifted.index.get_level_values("date").strftime("%Y-%m-%d").tolist()[::2] == ["2022-06-02", "2022-06-06", "2022-06-07"]
+    lagged = panel.hchyt.shift_trading(1, align=True)
+    assert lagged["factor"].tolist()[2:] == [1.0, 2.0, 3.0, 4.0] and lagged["factor"].iloc[:2].isna().all()
+
+    # 非交易日的数据向后填充到之后的交易日
+    weekly = pd.Series([1.0, 2.0], index=pd.to_datetime(["2022-06-01", "2022-06-04"]))
+    assert weekly.hchyt.reindex_trading("2022-06-01", "2022-06-07", fill="ffill").tolist() == [1.0, 1.0, 2.0, 2.0]
+    reindexed = panel.hchyt.reindex_trading("2022-06-01", "2022-06-07", fill="ffill")
+    assert len(reindexed) == 8 and reindexed.xs("B", level="symbol")["factor"].tolist() == [2.0, 4.0, 6.0, 6.0]
+    assert panel.hchyt.reindex_trading(end_date="2022-06-07")["factor"].isna().sum() == 2
+
+    # 单索引与面板数据的填充方式一致 (原数据中的缺失值不填充)，面板数据保持 (标的, 日期) 顺序
+    single = pd.Series([1.0, np.nan], index=pd.to_datetime(["2022-06-01", "2022-06-02"]))
+    filled = single.hchyt.reindex_trading("2022-06-01", "2022-06-06", fill="ffill")
+    assert filled.iloc[0] == 1.0 and filled.iloc[1:].isna().all()
+    by_symbol = pd.concat({"A": single, "B": single * 2}, names=["symbol", "date"])
+    reindexed = by_symbol.hchyt.reindex_trading("2022-06-01", "2022-06-06", fill="ffill")
+    assert reindexed.index.names == ["symbol", "date"] and reindexed.index.is_monotonic_increasing
+    assert reindexed.index.get_level_values("symbol").tolist() == ["A"] * 3 + ["B"] * 3
+    assert reindexed.xs("A", level="symbol").equals(filled)
+
+
+def test_security_master(tmp_path):
+    """
+    测试证券主表: 某日上市证券、是否上市查询及准确交易所回填
+    """
+    provider = FakeProvider(securities=[
+        ("000001.SZ", "主板", "1991-04-03", None),
+        ("600000.SH", "主板", "1999-11-10", None),
+        ("000005.SZ", "主板", "1990-12-10", "2024-04-26"),
+        ("300999.SZ", "创业板", "2020-10-01", "2021-01-01"),
+        ("300999.SZ", "创业板", "2022-01-01", None),
+        ("510300.SZ", "ETF", "2012-05-28", None),
+    ])
+    output = str(tmp_path / "securities.npz")
+    gen_securities(output=output, provider=provider)
+    try:
+        assert get_universe("2020-12-01", local_file=output) == ["600000.SH", "000001.SZ", "000005.SZ", "300999.SZ", "510300.SZ"]
+        assert get_universe("2024-05-01", exchange="SZSE", board="主板", style="jq", local_file=output) == ["000001.XSHE"]
+        assert is_listed("300999", ["2020-12-01", "2021-06-01", "2022-06-01"], local_file=output).tolist() == [True, False, True]
+        assert is_listed(["000005.SZ", "600000", "999999"], "2024-05-01", local_file=output).tolist() == [False, True, False]
+        assert not is_listed("600000.SH", "1999-11-09", local_file=output)
+        # 查询不改变标的代码格式化，显式登记后证券主表中的准确交易所优先于按前缀推断
+        assert fmt_symbols("510300", "ts") == "510300.SH"
+        load_securities(output, register=True)
+        assert fmt_symbols("510300", "ts") == "510300.SZ"
+    finally:
+        set_symbol_exchanges(None)
+    assert fmt_symbols("510300", "ts") == "510300.SH"
+
+    csv_file = tmp_path / "stock_basic.csv"
+    csv_file.write_text("ts_code,market,list_date,delist_date\n000001.SZ,主板,19910403,\n", encoding="utf-8")
+    gen_securities(output=output, source=str(csv_file))
+    assert len(load_securities(output, register=False)) == 1
+
+    # 与交易日历一同生成时，证券主表保存在交易日历文件所在目录
+    os.makedirs(tmp_path / "cal")
+    gen_trade_calendar("2023-01-01", "2023-01-31", output=str(tmp_path / "cal" / "trade_cal.bin"), provider=FakeProvider(), securities=str(csv_file))
+    assert len(load_securities(str(tmp_path / "cal" / "securities.npz"), register=False)) == 1
+
+
 def test_fmt_symbols():
     """
     测试格式化标的代码函数 
@@ -74,6 +544,25 @@ def test_fmt_symbols():
     assert "600000.XSHG" == fmt_symbols("600000", 'jq')
     assert ["000001.SZ", "600000.SH"] == fmt_symbols(["SZ000001", 'SH600000'], 'wd')
     assert ["000001", "600000"] == fmt_symbols(["SZ000001", 'SH600000'])
+    assert "000001.SH" == fmt_symbols("SH000001", 'ts')
+    assert "BJSE.830799" == fmt_symbols("830799", 'gm')
+    assert "430047.BJ" == fmt_symbols("430047.BJ", 'wd')
+    assert "688981.XSHG" == fmt_symbols("688981", 'jq')
+    assert "300750.SZ" == fmt_symbols("SZSE.300750", 'ts')
+
+def test_convert_symbols():
+    """
+    测试向量化格式化标的代码 
+    """
+    symbols = pd.Series(["SZ000001", None, "600000.XSHG", "SZ000001"], name="symbol")
+    converted = convert_symbols(symbols, 'gm')
+    assert converted.name == "symbol"
+    assert ["SZSE.000001", "SHSE.600000", "SZSE.000001"] == converted.dropna().tolist()
+    categorical = convert_symbols(pd.Series(["000001.SZ", "SZSE.000001", "830799"], dtype="category"), 'jq')
+    assert isinstance(categorical.dtype, pd.CategoricalDtype)
+    assert ["000001.XSHE", "000001.XSHE", "830799.BJSE"] == categorical.tolist()
+    assert ["000001.SZ", "688001.SH"] == convert_symbols(np.array(["000001", "688001"]), 'ts').tolist()
+    assert ["000001"] == convert_symbols(["SZSE.000001"])
 
 def test_get_trade_time_type():
     """
@@ -84,4 +573,115 @@ def test_get_trade_time_type():
     assert "auction1" == get_trade_time_type("2023-01-16 09:17:00")
     assert "auction2" == get_trade_time_type("2023-01-16 09:23:00")
     assert "auction3" == get_trade_time_type("2023-01-16 09:25:00")
-    assert "auction4" == get_trade_time_type("2023-01-16 14:58:00")
\ No newline at end of file
+    assert "auction4" == get_trade_time_type("2023-01-16 14:58:00")
+
+def test_get_trade_time_types():
+    """
+    测试批量交易时间判断 
+    """
+    cursor_times = pd.Series(pd.to_datetime([
+        "2023-01-15 09:30:00", "2023-01-16 09:17:00", "2023-01-16 09:23:00", "2023-01-16 09:25:00",
+        "2023-01-16 11:30:00", "2023-01-16 13:00:00", "2023-01-16 14:58:00", "2023-01-16 15:00:00", None,
+    ]), name="time")
+    sessions = get_trade_time_types(cursor_times)
+    assert isinstance(sessions.dtype, pd.CategoricalDtype) and sessions.name == "time"
+    assert [
+        "others", "auction1", "auction2", "auction3", "others", "continuous", "auction4", "others"
+    ] == sessions.iloc[:-1].tolist()
+    assert pd.isna(sessions.iloc[-1])
+    assert [get_trade_time_type(cursor_time) for cursor_time in cursor_times.iloc[:-1]] == sessions.iloc[:-1].tolist()
+    with pytest.raises(ValueError):
+        get_trade_time_type("2023-01-16 09:30:00", exchange="HKEX")
+    with pytest.raises(ValueError):
+        get_trade_time_types(cursor_times, exchange="HKEX")
+    with pytest.raises(ValueError):
+        shift_trade_minutes("2023-01-16 09:30:00", 1, exchange="HKEX")
+
+def test_get_bar_index():
+    """
+    测试生成分钟 K 线时间索引 
+    """
+    bars = get_bar_index("2023-01-13", "2023-01-16")
+    assert len(bars) == 480
+    assert bars[0] == pd.Timestamp("2023-01-13 09:31") and bars[119] == pd.Timestamp("2023-01-13 11:30")
+    assert bars[120] == pd.Timestamp("2023-01-13 13:01") and bars[-1] == pd.Timestamp("2023-01-16 15:00")
+    bars = get_bar_index("2023-01-14", "2023-01-16", freq="5min", label="left")
+    assert len(bars) == 48
+    assert bars[0] == pd.Timestamp("2023-01-16 09:30") and bars[-1] == pd.Timestamp("2023-01-16 14:55")
+
+def test_shift_trade_minutes():
+    """
+    测试交易分钟加减 
+    """
+    assert pd.Timestamp("2023-01-13 13:01") == shift_trade_minutes("2023-01-13 11:30", 1)
+    assert pd.Timestamp("2023-01-16 09:31") == shift_trade_minutes("2023-01-13 15:00", 1)
+    assert pd.Timestamp("2023-01-16 09:30") == shift_trade_minutes("2023-01-13 14:59", 1, label="left")
+    assert pd.Timestamp("2023-01-13 15:00") == shift_trade_minutes("2023-01-16 09:31", -1)
+    assert pd.Timestamp("2023-01-16 09:35") == shift_trade_minutes("2023-01-15 10:00", 5)
+    shifted = shift_trade_minutes(pd.Series(pd.to_datetime(["2023-01-13 10:00", None])), 240)
+    assert shifted.iloc[0] == pd.Timestamp("2023-01-16 10:00") and pd.isna(shifted.iloc[1])
+    clock = load_clock()
+    ordinals = clock.minute_ordinals(["2023-01-13 09:30", "2023-01-13 11:30", "2023-01-13 13:00"])
+    assert ordinals[1] == ordinals[2] == ordinals[0] + 120
+    assert clock.minutes_per_day == 240
+    assert pd.Timestamp("2023-01-13 11:30") == clock.from_minute_ordinals(clock.minute_ordinals("2023-01-13 11:30", label="right"), label="right")
+
+def test_cli(tmp_path, capsys):
+    """
+    测试命令行工具: 交易日历状态及按块批量转换
+    """
+    import json
+    from hchyt.cli import main
+
+    assert main(["status", "--json"]) == 0
+    status = json.loads(capsys.readouterr().out)
+    assert status["calendars"][0]["exchange"] == "SSE"
+
+    # 纯文本按块转换，空行原样输出
+    source = tmp_path / "dates.txt"
+    source.write_text("2022-06-04\n\n2022-06-06\n20220607\n")
+    output = tmp_path / "shifted.txt"
+    assert main(["shift", "1", "-i", str(source), "-o", str(output), "--chunksize", "2"]) == 0
+    assert output.read_text().splitlines() == ["2022-06-06", "", "2022-06-07", "2022-06-08"]
+
+    # CSV 转换指定列，其他列原样输出
+    source = tmp_path / "bars.csv"
+    source.write_text("time,symbol\n2023-01-16 09:26:00,SZ000001\n2023-01-15 10:00:00,600000\n")
+    output = tmp_path / "sessions.csv"
+    assert main(["session", "-i", str(source), "-o", str(output), "-c", "time", "--output-column", "session"]) == 0
+    assert pd.read_csv(output)["session"].tolist() == ["auction3", "others"]
+    assert main(["symbols", "-i", str(source), "-o", str(output), "-c", "symbol", "--style", "ts"]) == 0
+    assert pd.read_csv(output, dtype=str)["symbol"].tolist() == ["000001.SZ", "600000.SH"]
+    assert main(["snap", "-i", str(tmp_path / "missing.txt")]) == 1
+
+    # 从本地文件生成交易日历 (周日交易、周一休市) 及证券主表，并使用该交易日历转换
+    cal_source = tmp_path / "cal.csv"
+    cal_source.write_text("exchange,cal_date,is_open\nSSE,20230113,1\nSSE,20230115,1\nSSE,20230116,0\n")
+    calendar = str(tmp_path / "custom" / "trade_cal.bin")
+    os.makedirs(tmp_path / "custom")
+    gen_args = ["gen", "--start", "2023-01-13", "--end", "2023-01-16", "--output", calendar, "--source", str(cal_source)]
+    assert main(gen_args + ["--securities"]) == 1
+    assert "source" in capsys.readouterr().err
+    securities_source = tmp_path / "stock_basic.csv"
+    securities_source.write_text("ts_code,market,list_date,delist_date\n000001.SZ,主板,19910403,\n", encoding="utf-8")
+    assert main(gen_args + ["--securities-source", str(securities_source)]) == 0
+    assert len(load_securities(str(tmp_path / "custom" / "securities.npz"), register=False)) == 1
+    assert main(["session", "-i", str(source), "-o", str(output), "-c", "time", "--calendar", calendar]) == 0
+    assert pd.read_csv(output)["time"].tolist() == ["others", "continuous"]
+
+
+def test_lazy_imports():
+    """
+    测试导入 hchyt 及查询交易日、格式化标的代码时不导入 tushare、pandas
+    """
+    import subprocess
+    code = (
+        "import sys\n"
+        "from hchyt.utils import fmt_symbols, get_pre_trade_date\n"
+        "assert 'tushare' not in sys.modules and 'pandas' not in sys.modules\n"
+        "assert fmt_symbols('600000.SH', 'gm') == 'SHSE.600000'\n"
+        "get_pre_trade_date('2022-01-05')\n"
+        "assert 'tushare' not in sys.modules and 'pandas' not in sys.modules\n"
+    )
+    root = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+    subprocess.run([sys.executable, "-c", code], cwd=root, check=True)